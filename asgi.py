@@ -0,0 +1,232 @@
+# ==========================================================
+# ASGI Entry Point
+# ==========================================================
+
+# Serves the app from an ASGI server such as uvicorn:
+#
+#     uvicorn asgi:app --host 0.0.0.0 --port 5000
+#
+# Live game event streams run as coroutines on the event loop, so an idle
+# phone costs a queue rather than a thread. Every other request goes to the
+# Flask app unchanged on a pool of ASGI_THREADS threads, which keeps SQLite
+# access off the event loop and responses identical to the WSGI server.
+
+import asyncio
+import io
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask_app import (
+    app as wsgi_app,
+    get_db_connection,
+    game_event_broker,
+    EVENT_STREAM_HEARTBEAT_SECONDS,
+    EVENT_STREAM_MAX_PENDING,
+)
+
+EVENT_STREAM_PATH = re.compile(r'^/api/games/([^/]+)/events$')
+
+# Same headers as the Flask event stream route
+EVENT_STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+wsgi_executor = ThreadPoolExecutor(max_workers=wsgi_app.config['ASGI_THREADS'], thread_name_prefix='wsgi')
+
+# ----------------------------------------------------------
+# Regular requests, run by the Flask app in a worker thread
+# ----------------------------------------------------------
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope and request body into a WSGI environ"""
+    script_name = scope.get('root_path', '')
+    path_info = scope['path']
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path_info.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+
+        # Repeated headers are joined, as a WSGI server would
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    # The body is already buffered, so its length is known even when it arrived
+    # chunked or over HTTP/2 without a Content-Length header
+    environ['CONTENT_LENGTH'] = str(len(body))
+    environ['wsgi.input_terminated'] = True
+
+    return environ
+
+def run_wsgi_app(environ):
+    """Return (status, headers, body) of the Flask app's response"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    result = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+    return response['status'], response['headers'], body
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+async def serve_wsgi(scope, receive, send):
+    body = await read_body(receive)
+    if body is None:
+        return
+
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(wsgi_executor, run_wsgi_app, build_environ(scope, body))
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+# ----------------------------------------------------------
+# Live game events, served on the event loop
+# ----------------------------------------------------------
+
+# A stream subscribed to the events of one game; the broker may call send from any thread
+class AsyncGameEventSubscriber:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.closed = False
+
+    def send(self, message):
+        """Queue an encoded event, closing the subscriber if it has fallen too far behind"""
+        if self.queue.qsize() >= EVENT_STREAM_MAX_PENDING:
+            self.closed = True
+            message = None  # Wakes the stream so it ends
+
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # The event loop has shut down
+            self.closed = True
+
+    async def receive(self, timeout, disconnected):
+        """Return the next encoded event, or None on timeout or disconnect"""
+        get = asyncio.ensure_future(self.queue.get())
+        done, _ = await asyncio.wait({get, disconnected}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if get in done:
+            return get.result()
+
+        get.cancel()
+        return None
+
+def game_exists(game_id):
+    with wsgi_app.app_context():
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT id FROM games WHERE id = ?', (game_id,))
+        return cursor.fetchone() is not None
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+async def serve_game_events(game_id, scope, receive, send):
+    loop = asyncio.get_running_loop()
+
+    # Unknown games get the Flask route's 404 response
+    if not await loop.run_in_executor(wsgi_executor, game_exists, game_id):
+        await serve_wsgi(scope, receive, send)
+        return
+
+    subscriber = AsyncGameEventSubscriber(loop)
+    game_event_broker.subscribe(game_id, subscriber)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': EVENT_STREAM_HEADERS})
+
+        # Ask the browser to reconnect quickly if the stream drops
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+
+        while True:
+            message = await subscriber.receive(EVENT_STREAM_HEARTBEAT_SECONDS, disconnected)
+            if subscriber.closed or disconnected.done():
+                break
+
+            await send({
+                'type': 'http.response.body',
+                'body': message if message is not None else b': keep-alive\n\n',
+                'more_body': True
+            })
+
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        game_event_broker.unsubscribe(game_id, subscriber)
+        disconnected.cancel()
+
+# ----------------------------------------------------------
+# Application
+# ----------------------------------------------------------
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            wsgi_executor.shutdown(wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+
+    match = EVENT_STREAM_PATH.match(scope['path'])
+    if match and scope['method'] == 'GET':
+        await serve_game_events(match.group(1), scope, receive, send)
+    else:
+        await serve_wsgi(scope, receive, send)
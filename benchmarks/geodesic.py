@@ -0,0 +1,84 @@
+"""Compare the pure Python and NumPy distance functions in geodesic.py.
+
+Usage: python benchmarks/geodesic.py [--sizes 1000 10000] [--full]
+
+Pairwise checks in pure Python grow with the square of the number of points,
+so at 10k points they take minutes and only run with --full.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import geodesic
+
+# Python pairwise runs at or below this size unless --full is given
+PYTHON_PAIRWISE_LIMIT = 2000
+
+def random_points(count, seed=1):
+    """Points scattered over about 10 km around central London"""
+    rng = random.Random(seed)
+    return [(51.5 + rng.uniform(-0.05, 0.05), -0.12 + rng.uniform(-0.08, 0.08)) for _ in range(count)]
+
+def best_time(function, repeat):
+    """Return (fastest run in seconds, result of the last run)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def report(name, count, python_time, numpy_time):
+    speedup = f'{python_time / numpy_time:8.1f}x' if python_time and numpy_time else '       -'
+    python_text = f'{python_time * 1000:10.2f} ms' if python_time else '   skipped   '
+    numpy_text = f'{numpy_time * 1000:10.2f} ms' if numpy_time else '   skipped   '
+    print(f'{name:<22}{count:>8}  {python_text}  {numpy_text}  {speedup}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--full', action='store_true', help='Also run pure Python pairwise checks on large sizes.')
+    args = parser.parse_args()
+
+    if not geodesic.HAVE_NUMPY:
+        print('NumPy is not installed; timing the pure Python path only.\n')
+
+    print(f"{'benchmark':<22}{'points':>8}  {'python':>13}  {'numpy':>13}  {'speedup':>8}")
+
+    for count in args.sizes:
+        points = random_points(count)
+        lat, lng = points[0]
+
+        python_time, python_result = best_time(lambda: geodesic.distances_to_point_python(lat, lng, points), args.repeat)
+        numpy_time = None
+        if geodesic.HAVE_NUMPY:
+            numpy_time, numpy_result = best_time(lambda: geodesic.distances_to_point_numpy(lat, lng, points), args.repeat)
+            error = max(abs(a - b) for a, b in zip(python_result, numpy_result))
+            assert error < 1e-6, f'NumPy distances differ from the reference by {error} m'
+        report('point to bases', count, python_time, numpy_time)
+
+        # Twice the default capture radius, as used by the layout check
+        min_distance = 30
+
+        python_time = None
+        python_pairs = None
+        if args.full or count <= PYTHON_PAIRWISE_LIMIT:
+            python_time, python_pairs = best_time(lambda: geodesic.close_pairs_python(points, min_distance), 1)
+
+        numpy_time = None
+        if geodesic.HAVE_NUMPY:
+            numpy_time, numpy_pairs = best_time(lambda: geodesic.close_pairs_numpy(points, min_distance), args.repeat)
+            if python_pairs is not None:
+                assert [pair[:2] for pair in python_pairs] == [pair[:2] for pair in numpy_pairs], \
+                    'NumPy close pairs differ from the reference'
+        report('close pairs (layout)', count, python_time, numpy_time)
+
+if __name__ == '__main__':
+    main()
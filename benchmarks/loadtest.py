@@ -0,0 +1,340 @@
+"""Simulate a game day against the app and report latency per endpoint.
+
+Usage:
+    python benchmarks/loadtest.py [--players 50 --teams 4 --bases 10 --duration 60]
+    python benchmarks/loadtest.py --url http://localhost:5000 --admin-password secret
+    python benchmarks/loadtest.py --scenario festival.json --output results.json
+
+Without --url the app runs in this process through Flask's test client, on a
+throwaway database. A host, game, teams and bases are created through the real
+endpoints, then each simulated phone joins a team, polls the game every
+--poll-interval seconds (the polling cadence of core.js) and scans bases
+within capture range at --capture-rate scans per minute.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Scenario settings and their defaults; a --scenario file or the command line overrides them
+DEFAULT_SCENARIO = {
+    'players': 50,
+    'teams': 4,
+    'bases': 10,
+    'duration': 60,          # seconds of simulated play
+    'poll_interval': 5,      # seconds between game polls, as in core.js
+    'capture_rate': 2,       # base scans per player per minute
+    'capture_radius': 15,    # meters
+    'points_interval': 15,   # seconds
+}
+
+# Bases are laid out on a grid this far apart, so capture circles never overlap
+BASE_SPACING_METERS = 100
+CENTER = (51.5, -0.12)
+
+# ----------------------------------------------------------
+# HTTP clients
+# ----------------------------------------------------------
+
+class TestClientSession:
+    """Sends requests to the app in this process through Flask's test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.get_json(silent=True), response.headers
+
+class LiveSession:
+    """Sends requests to a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, parse_json(response.read()), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, parse_json(e.read()), e.headers
+
+def parse_json(data):
+    try:
+        return json.loads(data) if data else None
+    except ValueError:
+        return None
+
+# ----------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------
+
+class Recorder:
+    """Collects the latency and status of every request, by endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # endpoint -> list of (seconds, status)
+
+    def timed(self, session, endpoint, method, path, body=None, headers=None):
+        start = time.perf_counter()
+        try:
+            status, data, response_headers = session.request(method, path, body, headers)
+        except Exception:
+            # Connection errors count as failures with no status
+            status, data, response_headers = 0, None, {}
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((elapsed, status))
+        return status, data, response_headers
+
+    def summary(self):
+        endpoints = {}
+        with self.lock:
+            for endpoint, samples in sorted(self.samples.items()):
+                latencies = sorted(seconds for seconds, _ in samples)
+                errors = sum(1 for _, status in samples if status == 0 or status >= 400)
+                statuses = {}
+                for _, status in samples:
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+                endpoints[endpoint] = {
+                    'requests': len(samples),
+                    'errors': errors,
+                    'error_rate': round(errors / len(samples), 4),
+                    'statuses': statuses,
+                    'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+                    'p50_ms': percentile_ms(latencies, 50),
+                    'p95_ms': percentile_ms(latencies, 95),
+                    'p99_ms': percentile_ms(latencies, 99),
+                    'max_ms': round(latencies[-1] * 1000, 2),
+                }
+        return endpoints
+
+def percentile_ms(sorted_latencies, percent):
+    """Nearest-rank percentile, in milliseconds"""
+    rank = max(1, -(-len(sorted_latencies) * percent // 100))
+    return round(sorted_latencies[rank - 1] * 1000, 2)
+
+# ----------------------------------------------------------
+# Game day
+# ----------------------------------------------------------
+
+def base_position(index):
+    """Position of the index-th base on a square grid around CENTER"""
+    columns = 10
+    meters_per_degree = 111195
+    row, column = divmod(index, columns)
+    lat = CENTER[0] + row * BASE_SPACING_METERS / meters_per_degree
+    lng = CENTER[1] + column * BASE_SPACING_METERS / meters_per_degree / 0.62  # cos(51.5 degrees)
+    return lat, lng
+
+def set_up_game(session, recorder, scenario, admin_password):
+    """Create a host, a game, its teams and bases, and start it; return (game id, team ids, bases)"""
+    run_id = uuid.uuid4().hex[:8]
+    admin = {'Authorization': f'Bearer {admin_password}'}
+
+    status, host, _ = recorder.timed(session, 'POST /api/hosts', 'POST', '/api/hosts',
+                                     {'name': f'Load test {run_id}'}, admin)
+    if status != 201:
+        raise SystemExit(f'Could not create a host (status {status}); check the admin password')
+
+    status, game, _ = recorder.timed(session, 'POST /api/games', 'POST', '/api/games', {
+        'host_id': host['id'],
+        'name': f'Load test {run_id}',
+        'capture_radius_meters': scenario['capture_radius'],
+        'points_interval_seconds': scenario['points_interval'],
+    })
+    if status != 201:
+        raise SystemExit(f'Could not create a game (status {status}): {game}')
+    game_id = game['game_id']
+
+    team_ids = []
+    for index in range(scenario['teams']):
+        status, team, _ = recorder.timed(session, 'POST /api/games/<id>/teams', 'POST', f'/api/games/{game_id}/teams', {
+            'host_id': host['id'],
+            'name': f'Team {index + 1}',
+            'color': random.choice(['red', 'blue', 'green', 'yellow', 'purple', 'orange']),
+            'qr_code': f'loadtest-{run_id}-team-{index}',
+        })
+        if status != 201:
+            raise SystemExit(f'Could not add a team (status {status}): {team}')
+        team_ids.append(team['team_id'])
+
+    bases = []
+    for index in range(scenario['bases']):
+        lat, lng = base_position(index)
+        status, base, _ = recorder.timed(session, 'POST /api/games/<id>/bases', 'POST', f'/api/games/{game_id}/bases', {
+            'host_id': host['id'],
+            'name': f'Base {index + 1}',
+            'latitude': lat,
+            'longitude': lng,
+            'qr_code': f'loadtest-{run_id}-base-{index}',
+        })
+        if status != 201:
+            raise SystemExit(f'Could not add a base (status {status}): {base}')
+        bases.append((base['base_id'], lat, lng))
+
+    status, result, _ = recorder.timed(session, 'POST /api/games/<id>/start', 'POST', f'/api/games/{game_id}/start',
+                                       {'host_id': host['id']})
+    if status != 200:
+        raise SystemExit(f'Could not start the game (status {status}): {result}')
+
+    return game_id, team_ids, bases
+
+def simulate_phone(make_session, recorder, scenario, game_id, team_id, bases, stop_time, seed):
+    """One player: join a team, then poll and scan bases until stop_time"""
+    rng = random.Random(seed)
+    session = make_session()
+
+    # Phones don't all arrive at the same instant
+    time.sleep(rng.uniform(0, scenario['poll_interval']))
+
+    status, joined, _ = recorder.timed(session, 'POST /api/teams/<id>/join', 'POST', f'/api/teams/{team_id}/join',
+                                       {'player_name': f'Player {seed}'})
+    if status != 200:
+        return
+    player_id = joined['player_id']
+
+    etag = None
+    next_poll = time.time()
+    capture_interval = 60 / scenario['capture_rate'] if scenario['capture_rate'] > 0 else None
+    next_capture = time.time() + rng.expovariate(1 / capture_interval) if capture_interval else float('inf')
+
+    def poll():
+        nonlocal etag
+        headers = {'If-None-Match': etag} if etag else {}
+        status, _, response_headers = recorder.timed(session, 'GET /api/games/<id>', 'GET', f'/api/games/{game_id}',
+                                                     headers=headers)
+        if status == 200:
+            etag = response_headers.get('ETag')
+
+    while True:
+        now = time.time()
+        if now >= stop_time:
+            return
+
+        if now >= next_poll:
+            poll()
+            next_poll += scenario['poll_interval']
+
+        if now >= next_capture:
+            # Stand somewhere inside the capture circle of a random base
+            base_id, lat, lng = rng.choice(bases)
+            offset = scenario['capture_radius'] * 0.5 / 111195
+            recorder.timed(session, 'POST /api/bases/<id>/capture', 'POST', f'/api/bases/{base_id}/capture', {
+                'player_id': player_id,
+                'latitude': lat + rng.uniform(-offset, offset),
+                'longitude': lng,
+            })
+
+            # core.js refreshes the game straight after a capture
+            poll()
+            next_capture += rng.expovariate(1 / capture_interval)
+
+        time.sleep(max(0, min(next_poll, next_capture, stop_time) - time.time()))
+
+# ----------------------------------------------------------
+# Command line
+# ----------------------------------------------------------
+
+def load_scenario(args):
+    scenario = dict(DEFAULT_SCENARIO)
+    if args.scenario:
+        with open(args.scenario) as scenario_file:
+            scenario.update(json.load(scenario_file))
+
+    for key in DEFAULT_SCENARIO:
+        value = getattr(args, key)
+        if value is not None:
+            scenario[key] = value
+    return scenario
+
+def make_session_factory(args):
+    """Return (function making a session, description of the target)"""
+    if args.url:
+        return (lambda: LiveSession(args.url)), args.url
+
+    # Run the app in this process on a throwaway database
+    database_dir = tempfile.mkdtemp(prefix='qr-conquest-loadtest-')
+    os.environ['DATABASE_PATH'] = os.path.join(database_dir, 'loadtest.db')
+    os.environ.setdefault('SITE_ADMIN_PASSWORD', args.admin_password)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+    import flask_app
+    args.admin_password = flask_app.SITE_ADMIN_PASSWORD
+
+    return (lambda: TestClientSession(flask_app.app)), 'test client'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server; defaults to an in-process test client.')
+    parser.add_argument('--admin-password', default=os.environ.get('SITE_ADMIN_PASSWORD', 'loadtest'))
+    parser.add_argument('--scenario', help='JSON file of scenario settings.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--seed', type=int, default=1)
+    for key, default in DEFAULT_SCENARIO.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=type(default), help=f'Default {default}.')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args)
+    random.seed(args.seed)
+    make_session, target = make_session_factory(args)
+
+    recorder = Recorder()
+    game_id, team_ids, bases = set_up_game(make_session(), recorder, scenario, args.admin_password)
+    print(f"Game {game_id}: {scenario['players']} players, {len(team_ids)} teams, {len(bases)} bases, "
+          f"{scenario['duration']}s against {target}")
+
+    started = time.time()
+    stop_time = started + scenario['duration']
+
+    with ThreadPoolExecutor(max_workers=scenario['players']) as pool:
+        for index in range(scenario['players']):
+            pool.submit(simulate_phone, make_session, recorder, scenario, game_id,
+                        team_ids[index % len(team_ids)], bases, stop_time, args.seed * 100000 + index)
+
+    elapsed = time.time() - started
+    endpoints = recorder.summary()
+    total_requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+    total_errors = sum(endpoint['errors'] for endpoint in endpoints.values())
+
+    print(f"\n{'endpoint':<32}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, endpoint in endpoints.items():
+        print(f"{name:<32}{endpoint['requests']:>9}{endpoint['errors']:>8}"
+              f"{endpoint['p50_ms']:>9}{endpoint['p95_ms']:>9}{endpoint['p99_ms']:>9}")
+    print(f'\n{total_requests} requests in {elapsed:.1f}s ({total_requests / elapsed:.1f}/s), {total_errors} errors')
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({
+                'target': target,
+                'scenario': scenario,
+                'started': int(started),
+                'elapsed_seconds': round(elapsed, 2),
+                'requests': total_requests,
+                'errors': total_errors,
+                'requests_per_second': round(total_requests / elapsed, 2),
+                'endpoints': endpoints,
+            }, output_file, indent=2)
+        print(f'Results written to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""Time scoring and game state assembly on synthetic games of growing size.
+
+Usage:
+    python benchmarks/scoring.py [--teams 4 40] [--bases 10 100 1000] [--captures-per-base 10 100 1000]
+    python benchmarks/scoring.py --save baseline.json
+    python benchmarks/scoring.py --compare baseline.json [--threshold 0.25]
+
+Every game is built directly in a throwaway SQLite database. The first value
+of each size option is the baseline game; each dimension is then grown on its
+own while the others stay at their first value, so the report shows how each
+operation scales with teams, bases and captures separately.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+# The app reads its settings at import, so point it at a throwaway database first
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='qr-conquest-bench-'), 'scoring.db')
+os.environ.setdefault('SITE_ADMIN_PASSWORD', 'benchmark')
+os.environ.setdefault('LIFECYCLE_SCHEDULER_ENABLED', 'false')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import flask_app
+
+# Each measurement repeats a call until it has run for at least this long
+MIN_RUN_SECONDS = 0.05
+
+# Default slowdown, as a fraction, reported as a regression by --compare
+DEFAULT_THRESHOLD = 0.25
+
+DIMENSIONS = ['teams', 'bases', 'captures_per_base']
+
+# ----------------------------------------------------------
+# Synthetic games
+# ----------------------------------------------------------
+
+def build_game(conn, teams, bases, captures_per_base, players_per_team, seed=1):
+    """Insert an active game of the given size and return its row, with host_name"""
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    now = int(time.time())
+    start_time = now - 3 * 3600
+
+    host_id = str(uuid.uuid4())
+    game_id = str(uuid.uuid4())
+    cursor.execute('BEGIN IMMEDIATE')
+    cursor.execute('INSERT INTO hosts (id, name, qr_code, creation_date) VALUES (?, ?, ?, ?)',
+                   (host_id, 'Benchmark', str(uuid.uuid4()), now))
+    cursor.execute('''
+    INSERT INTO games (id, host_id, name, start_time, status, created_time)
+    VALUES (?, ?, ?, ?, 'active', ?)
+    ''', (game_id, host_id, f'{teams}x{bases}x{captures_per_base}', start_time, start_time))
+
+    team_ids = [str(uuid.uuid4()) for _ in range(teams)]
+    cursor.executemany('INSERT INTO teams (id, game_id, name, color, qr_code) VALUES (?, ?, ?, ?, ?)',
+                       [(team_id, game_id, f'Team {i}', 'red', str(uuid.uuid4())) for i, team_id in enumerate(team_ids)])
+    cursor.executemany('INSERT INTO players (id, team_id, name, join_time) VALUES (?, ?, ?, ?)',
+                       [(str(uuid.uuid4()), team_id, f'Player {i}', start_time + i)
+                        for team_id in team_ids for i in range(players_per_team)])
+
+    base_ids = [str(uuid.uuid4()) for _ in range(bases)]
+    cursor.executemany('''
+    INSERT INTO bases (id, game_id, name, latitude, longitude, qr_code) VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(base_id, game_id, f'Base {i}', 51.5 + rng.uniform(-0.01, 0.01), -0.12 + rng.uniform(-0.01, 0.01),
+           str(uuid.uuid4())) for i, base_id in enumerate(base_ids)])
+
+    # Captures spread evenly over the game so far
+    spacing = max(1, (now - start_time) // (captures_per_base + 1))
+    cursor.executemany('INSERT INTO captures (id, base_id, team_id, capture_time) VALUES (?, ?, ?, ?)',
+                       [(str(uuid.uuid4()), base_id, rng.choice(team_ids), start_time + (i + 1) * spacing)
+                        for base_id in base_ids for i in range(captures_per_base)])
+
+    game = load_game(cursor, game_id)
+    flask_app.rebuild_score_ledger(cursor, game)
+    conn.commit()
+
+    return game
+
+def load_game(cursor, game_id):
+    cursor.execute('''
+    SELECT g.*, h.name AS host_name FROM games g JOIN hosts h ON g.host_id = h.id WHERE g.id = ?
+    ''', (game_id,))
+    return cursor.fetchone()
+
+# ----------------------------------------------------------
+# Measurements
+# ----------------------------------------------------------
+
+def time_per_call(function, repeat):
+    """Return the fastest time of one call in seconds, over repeat runs of a calibrated loop"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        if time.perf_counter() - start >= MIN_RUN_SECONDS:
+            break
+        number *= 2
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = (time.perf_counter() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure(conn, client, game, repeat):
+    """Return seconds per call of each operation for one game"""
+    cursor = conn.cursor()
+    game_id = game['id']
+    cache = flask_app.game_snapshot_cache
+
+    snapshot = flask_app.load_game_snapshot(cursor, game)
+    banked = {team['id']: team['banked_points'] for team in snapshot['teams']}
+
+    def uncached_snapshot():
+        cache.invalidate(game_id)
+        return flask_app.load_game_snapshot(cursor, game)
+
+    def get_game_uncached():
+        cache.invalidate(game_id)
+        return client.get(f'/api/games/{game_id}')
+
+    first = snapshot['bases'][0]
+
+    return {
+        'calculate_team_scores': time_per_call(lambda: flask_app.calculate_team_scores(game, banked, snapshot['holds']), repeat),
+        'load_game_snapshot': time_per_call(uncached_snapshot, repeat),
+        'build_game_details': time_per_call(lambda: flask_app.build_game_details(game, snapshot), repeat),
+        'get_game (uncached)': time_per_call(get_game_uncached, repeat),
+        'get_game (cached)': time_per_call(lambda: client.get(f'/api/games/{game_id}'), repeat),
+        'get_scores (cached)': time_per_call(lambda: client.get(f'/api/games/{game_id}/scores'), repeat),
+        'replay_score_ledger': time_per_call(lambda: flask_app.replay_score_ledger(cursor, game), repeat),
+        'calculate_distance': time_per_call(lambda: flask_app.calculate_distance(51.5, -0.12, first['lat'], first['lng']), repeat),
+    }
+
+def size_key(size):
+    return 'teams={teams} bases={bases} captures_per_base={captures_per_base}'.format(**size)
+
+def sizes_to_run(args):
+    """Return the baseline size followed by each dimension grown on its own"""
+    baseline = {dimension: getattr(args, dimension)[0] for dimension in DIMENSIONS}
+    sizes = [baseline]
+    for dimension in DIMENSIONS:
+        for value in getattr(args, dimension)[1:]:
+            sizes.append(dict(baseline, **{dimension: value}))
+    return baseline, sizes
+
+# ----------------------------------------------------------
+# Reports
+# ----------------------------------------------------------
+
+def print_results(results, sizes):
+    """One row per operation, one column per game size"""
+    labels = ['{teams}t/{bases}b/{captures_per_base}c'.format(**size) for size in sizes]
+    print(f"{'microseconds per call':<24}" + ''.join(f'{label:>16}' for label in labels))
+    for operation in next(iter(results.values())):
+        print(f'{operation:<24}' + ''.join(f'{results[size_key(size)][operation] * 1e6:>16.1f}' for size in sizes))
+
+def print_scaling(baseline, results, args):
+    """For each dimension, how much slower each operation gets as it grows"""
+    base_results = results[size_key(baseline)]
+    print('\nScaling (time relative to the baseline game):')
+    for dimension in DIMENSIONS:
+        for value in getattr(args, dimension)[1:]:
+            size = dict(baseline, **{dimension: value})
+            factor = value / baseline[dimension]
+            print(f'\n  {dimension} x{factor:g} ({baseline[dimension]} -> {value})')
+            for operation, seconds in results[size_key(size)].items():
+                print(f'    {operation:<24} x{seconds / base_results[operation]:.2f}')
+
+def compare(results, baseline_path, threshold):
+    """Print operations slower than in the saved baseline by more than threshold; return how many"""
+    with open(baseline_path) as baseline_file:
+        saved = json.load(baseline_file)['results']
+
+    regressions = 0
+    print(f'\nCompared with {baseline_path} (threshold +{threshold:.0%}):')
+    for key, operations in results.items():
+        for operation, seconds in operations.items():
+            before = saved.get(key, {}).get(operation)
+            if before is None:
+                continue
+            change = seconds / before - 1
+            if change > threshold:
+                regressions += 1
+                print(f'  REGRESSION {operation} at {key}: {before * 1e6:.1f} us -> {seconds * 1e6:.1f} us ({change:+.0%})')
+
+    if regressions == 0:
+        print('  No regressions')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, nargs='+', default=[4, 40])
+    parser.add_argument('--bases', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--captures-per-base', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--players-per-team', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='Write the results to this baseline file.')
+    parser.add_argument('--compare', help='Baseline file to compare the results with.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Slowdown reported as a regression, as a fraction (default {DEFAULT_THRESHOLD}).')
+    args = parser.parse_args()
+
+    baseline, sizes = sizes_to_run(args)
+    conn = flask_app.open_db_connection()
+    client = flask_app.app.test_client()
+
+    results = {}
+    for size in sizes:
+        print(f'Measuring {size_key(size)}...', file=sys.stderr)
+        game = build_game(conn, size['teams'], size['bases'], size['captures_per_base'], args.players_per_team)
+        results[size_key(size)] = measure(conn, client, game, args.repeat)
+
+    print_results(results, sizes)
+    print_scaling(baseline, results, args)
+
+    if args.save:
+        with open(args.save, 'w') as save_file:
+            json.dump({'created': int(time.time()), 'players_per_team': args.players_per_team, 'results': results},
+                      save_file, indent=2)
+        print(f'\nBaseline written to {args.save}')
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,35 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
+import click
 import sqlite3
+import csv
+import io
 import uuid
 import time
 import json
+import zlib
+import gzip
+import hashlib
+import mimetypes
+import re
 from datetime import datetime
 import os
 import math
 import random
-from functools import wraps
+import queue
+import atexit
+import threading
+import heapq
+import bisect
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from functools import wraps, lru_cache
+from geodesic import calculate_distance, close_pairs, distances_to_point, EARTH_RADIUS_METERS
+
+# Brotli is optional; without it responses are only gzipped
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__, static_folder='static')
 
@@ -39,6 +61,82 @@ def require_site_admin(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# ==========================================================
+# Configuration
+# ==========================================================
+
+# Helper function to read a setting from the environment, typed like its default
+def env_setting(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return type(default)(value)
+
+# Every setting can be overridden with an environment variable of the same name
+app.config.update(
+    # SQLite database and connection settings
+    DATABASE_PATH=env_setting('DATABASE_PATH', 'qr_game.db'),
+    DB_POOL_SIZE=env_setting('DB_POOL_SIZE', 16),
+    DB_BUSY_TIMEOUT_MS=env_setting('DB_BUSY_TIMEOUT_MS', 5000),
+    DB_JOURNAL_MODE=env_setting('DB_JOURNAL_MODE', 'WAL'),
+    DB_SYNCHRONOUS=env_setting('DB_SYNCHRONOUS', 'NORMAL'),
+    DB_CACHE_SIZE_KIB=env_setting('DB_CACHE_SIZE_KIB', 16384),
+    DB_MMAP_SIZE=env_setting('DB_MMAP_SIZE', 268435456),
+
+    # Most bases and teams accepted in one setup import
+    IMPORT_MAX_ROWS=env_setting('IMPORT_MAX_ROWS', 2000),
+
+    # Most captures accepted in one offline sync request
+    CAPTURE_BATCH_MAX_SIZE=env_setting('CAPTURE_BATCH_MAX_SIZE', 100),
+    # Oldest an offline capture may be backdated to, in seconds before it is synced
+    CAPTURE_MAX_OFFLINE_SECONDS=env_setting('CAPTURE_MAX_OFFLINE_SECONDS', 3600),
+
+    # In-memory cache of assembled game snapshots
+    GAME_CACHE_ENABLED=env_setting('GAME_CACHE_ENABLED', True),
+    GAME_CACHE_MAX_ENTRIES=env_setting('GAME_CACHE_MAX_ENTRIES', 256),
+
+    # Run auto-start and auto-end in this process; disable when a separate run-scheduler worker does it
+    LIFECYCLE_SCHEDULER_ENABLED=env_setting('LIFECYCLE_SCHEDULER_ENABLED', True),
+
+    # In-memory throttling of capture scans: a token bucket per player (games may override the
+    # rate and burst) and a short-lived cache of each base's holder, so rescans by the holding team skip the database
+    CAPTURE_THROTTLE_ENABLED=env_setting('CAPTURE_THROTTLE_ENABLED', True),
+    CAPTURE_SCANS_PER_MINUTE=env_setting('CAPTURE_SCANS_PER_MINUTE', 6),
+    CAPTURE_SCAN_BURST=env_setting('CAPTURE_SCAN_BURST', 3),
+    CAPTURE_HOLDER_TTL_SECONDS=env_setting('CAPTURE_HOLDER_TTL_SECONDS', 10),
+
+    # Single writer thread committing captures and joins in groups, instead of one commit per request
+    WRITE_QUEUE_ENABLED=env_setting('WRITE_QUEUE_ENABLED', True),
+    WRITE_QUEUE_MAX_PENDING=env_setting('WRITE_QUEUE_MAX_PENDING', 1000),
+    WRITE_BATCH_MAX_SIZE=env_setting('WRITE_BATCH_MAX_SIZE', 100),
+    WRITE_BATCH_DELAY_MS=env_setting('WRITE_BATCH_DELAY_MS', 2.0),
+    WRITE_TIMEOUT_SECONDS=env_setting('WRITE_TIMEOUT_SECONDS', 10.0),
+
+    # Threads running regular requests when served through asgi.py; event streams need none
+    ASGI_THREADS=env_setting('ASGI_THREADS', 32),
+
+    # Compression of API responses of at least COMPRESSION_MIN_BYTES, negotiated with Accept-Encoding
+    COMPRESSION_ENABLED=env_setting('COMPRESSION_ENABLED', True),
+    COMPRESSION_MIN_BYTES=env_setting('COMPRESSION_MIN_BYTES', 1024),
+    COMPRESSION_GZIP_LEVEL=env_setting('COMPRESSION_GZIP_LEVEL', 6),
+    COMPRESSION_BROTLI_LEVEL=env_setting('COMPRESSION_BROTLI_LEVEL', 5),
+    COMPRESSION_CACHE_MAX_ENTRIES=env_setting('COMPRESSION_CACHE_MAX_ENTRIES', 256),
+
+    # Serve static/ from a manifest read at startup, with content-hashed URLs and precompressed files.
+    # Disable while editing static files, so changes show without a restart
+    STATIC_MANIFEST_ENABLED=env_setting('STATIC_MANIFEST_ENABLED', True),
+
+    # Request metrics served at /api/admin/metrics; when disabled nothing is recorded at all
+    METRICS_ENABLED=env_setting('METRICS_ENABLED', True),
+
+    # Opt-in SQL profiler logging statements repeated in one request (N+1 queries) and slow statements
+    SQL_PROFILER_ENABLED=env_setting('SQL_PROFILER_ENABLED', False),
+    SQL_PROFILER_REPEAT_THRESHOLD=env_setting('SQL_PROFILER_REPEAT_THRESHOLD', 10),
+    SQL_PROFILER_SLOW_MS=env_setting('SQL_PROFILER_SLOW_MS', 100.0),
+)
+
 # ==========================================================
 # Word Lists for Game Code Generation
 # ==========================================================
@@ -79,13 +177,11 @@ def generate_unique_game_code():
         code = generate_game_code()
         cursor.execute('SELECT id FROM games WHERE id = ?', (code,))
         if not cursor.fetchone():
-            conn.close()
             return code
 
     # If we couldn't generate a unique code after 10 attempts,
     # add a random number suffix to ensure uniqueness
     code = f"{generate_game_code()}-{random.randint(1, 999)}"
-    conn.close()
     return code
 
 
@@ -94,17 +190,377 @@ def generate_unique_game_code():
 # ==========================================================
 
 # Database setup
-def get_db_connection():
-    conn = sqlite3.connect('qr_game.db')
+def open_db_connection():
+    """Open a new connection configured from app.config"""
+    conn = sqlite3.connect(
+        app.config['DATABASE_PATH'],
+        timeout=app.config['DB_BUSY_TIMEOUT_MS'] / 1000,
+        check_same_thread=False,  # Pooled connections move between worker threads
+        factory=ProfiledConnection if app.config['SQL_PROFILER_ENABLED'] else sqlite3.Connection
+    )
     conn.row_factory = sqlite3.Row
+
+    conn.execute(f"PRAGMA journal_mode = {app.config['DB_JOURNAL_MODE']}")
+    conn.execute(f"PRAGMA synchronous = {app.config['DB_SYNCHRONOUS']}")
+    conn.execute(f"PRAGMA busy_timeout = {int(app.config['DB_BUSY_TIMEOUT_MS'])}")
+    conn.execute(f"PRAGMA cache_size = -{int(app.config['DB_CACHE_SIZE_KIB'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(app.config['DB_MMAP_SIZE'])}")
+
+    if app.config['METRICS_ENABLED']:
+        conn.set_trace_callback(trace_sql_statement)
+
     return conn
 
-# Initialize database
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# Pool of idle connections, reused across requests instead of reconnecting each time
+class ConnectionPool:
+    def __init__(self, max_idle):
+        self.max_idle = max_idle
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                self.opened += 1
+            return open_db_connection()
+
+    def release(self, conn):
+        # Never hand the next request a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self.idle.qsize() < self.max_idle:
+            self.idle.put(conn)
+        else:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+db_pool = ConnectionPool(app.config['DB_POOL_SIZE'])
+atexit.register(db_pool.close_all)
+
+def get_db_connection():
+    """Return the connection of the current app context, taken from the pool on first use.
+
+    The connection goes back to the pool when the app context is torn down,
+    so callers must not close it."""
+    if 'db_connection' not in g:
+        g.db_connection = db_pool.acquire()
+    return g.db_connection
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    conn = g.pop('db_connection', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+# ==========================================================
+# Metrics
+# ==========================================================
+
+# Request latency, status, response size and SQL statement counts by route,
+# exported in the Prometheus text format. Recording a request costs one lock
+# and a few bisects, so it can stay on under load.
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS_SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+RESPONSE_SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+COMPRESSION_RATIO_BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1)
+
+# Fixed-bucket histogram; the caller holds the registry lock
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}  # (method, route) -> (latency, size, SQL statements) histograms
+        self.statuses = {}  # (method, route, status) -> count
+        self.compression = {}  # encoding -> [bytes in, bytes out, compressed/original size histogram]
+
+    def observe_request(self, method, route, status, seconds, size, sql_statements):
+        with self.lock:
+            histograms = self.routes.get((method, route))
+            if histograms is None:
+                histograms = self.routes[(method, route)] = (
+                    Histogram(LATENCY_BUCKETS_SECONDS),
+                    Histogram(RESPONSE_SIZE_BUCKETS_BYTES),
+                    Histogram(SQL_STATEMENT_BUCKETS)
+                )
+
+            latency, response_size, statements = histograms
+            latency.observe(seconds)
+            # Streamed responses such as event streams have no size up front
+            if size is not None:
+                response_size.observe(size)
+            statements.observe(sql_statements)
+
+            key = (method, route, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def observe_compression(self, encoding, original_size, compressed_size):
+        with self.lock:
+            totals = self.compression.get(encoding)
+            if totals is None:
+                totals = self.compression[encoding] = [0, 0, Histogram(COMPRESSION_RATIO_BUCKETS)]
+
+            totals[0] += original_size
+            totals[1] += compressed_size
+            totals[2].observe(compressed_size / original_size)
+
+    def render(self):
+        """Return the request metrics as Prometheus text lines"""
+        with self.lock:
+            routes = sorted(self.routes.items())
+            statuses = sorted(self.statuses.items())
+            compression = sorted(self.compression.items())
+
+            lines = [
+                '# HELP qr_conquest_http_requests_total Requests handled, by route and status.',
+                '# TYPE qr_conquest_http_requests_total counter',
+            ]
+            for (method, route, status), count in statuses:
+                lines.append(f'qr_conquest_http_requests_total{{{route_labels(method, route)},status="{status}"}} {count}')
+
+            histograms = [
+                ('qr_conquest_http_request_duration_seconds', 'Time to handle a request, by route.'),
+                ('qr_conquest_http_response_size_bytes', 'Size of response bodies, by route.'),
+                ('qr_conquest_http_request_sql_statements', 'SQL statements run by a request, by route, including its queued writes.'),
+            ]
+            for index, (name, description) in enumerate(histograms):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for (method, route), route_histograms in routes:
+                    lines.extend(route_histograms[index].render(name, route_labels(method, route)))
+
+            lines += [
+                '# HELP qr_conquest_http_compression_input_bytes_total Response bytes before compression, by encoding.',
+                '# TYPE qr_conquest_http_compression_input_bytes_total counter',
+            ]
+            lines += [f'qr_conquest_http_compression_input_bytes_total{{encoding="{encoding}"}} {totals[0]}'
+                      for encoding, totals in compression]
+            lines += [
+                '# HELP qr_conquest_http_compression_output_bytes_total Response bytes after compression, by encoding.',
+                '# TYPE qr_conquest_http_compression_output_bytes_total counter',
+            ]
+            lines += [f'qr_conquest_http_compression_output_bytes_total{{encoding="{encoding}"}} {totals[1]}'
+                      for encoding, totals in compression]
+            lines += [
+                '# HELP qr_conquest_http_compression_ratio Compressed size as a fraction of the original, by encoding.',
+                '# TYPE qr_conquest_http_compression_ratio histogram',
+            ]
+            for encoding, totals in compression:
+                lines.extend(totals[2].render('qr_conquest_http_compression_ratio', f'encoding="{encoding}"'))
+
+        return lines
+
+# Helper function to format the labels of a route
+def route_labels(method, route):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+metrics = MetricsRegistry()
+
+# SQL statements run by the request on each thread, counted by the connection trace callback
+request_metrics = threading.local()
+
+def trace_sql_statement(statement):
+    request_metrics.sql_statements = getattr(request_metrics, 'sql_statements', 0) + 1
+
+if app.config['METRICS_ENABLED']:
+    @app.before_request
+    def start_request_metrics():
+        request_metrics.start = time.perf_counter()
+        request_metrics.sql_statements = 0
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = getattr(request_metrics, 'start', None)
+        if start is not None:
+            # Requests that match no route are grouped together so paths can't flood the registry
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.observe_request(
+                request.method,
+                route,
+                response.status_code,
+                time.perf_counter() - start,
+                response.calculate_content_length(),
+                request_metrics.sql_statements
+            )
+            request_metrics.start = None
+        return response
+
+# ==========================================================
+# SQL Profiler
+# ==========================================================
+
+# When enabled, every statement a request runs is timed, including fetching
+# its rows, and grouped by shape: the statement with its literals replaced by
+# ?. A request that runs one shape more than SQL_PROFILER_REPEAT_THRESHOLD
+# times, usually a query inside a loop, or any statement slower than
+# SQL_PROFILER_SLOW_MS is logged. In debug mode every response also carries
+# an X-SQL-Profile summary header.
+
+SQL_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_PLACEHOLDER_LIST_PATTERN = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+# Statements run by the request on each thread, as [sql, seconds] lists; None outside a profiled request
+sql_profile = threading.local()
+
+# Helper function to reduce a statement to its shape
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    shape = SQL_LITERAL_PATTERN.sub('?', sql)
+    shape = SQL_PLACEHOLDER_LIST_PATTERN.sub('(?)', shape)
+    return ' '.join(shape.split())
+
+def begin_sql_execution(sql):
+    """Add a statement to the current request's profile and return its entry, or None"""
+    executions = getattr(sql_profile, 'executions', None)
+    if executions is None:
+        return None
+
+    execution = [sql, 0.0]
+    executions.append(execution)
+    return execution
+
+# Cursor adding the time of each call to the statement it last executed
+class ProfiledCursor(sqlite3.Cursor):
+    execution = None
+
+    def timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self.execution is not None:
+                self.execution[1] += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        self.execution = begin_sql_execution(sql)
+        return self.timed(super().execute, sql, parameters)
+
+    # A whole executemany counts once, as it is a single call from Python
+    def executemany(self, sql, seq_of_parameters):
+        self.execution = begin_sql_execution(sql)
+        return self.timed(super().executemany, sql, seq_of_parameters)
+
+    def fetchone(self):
+        return self.timed(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self.timed(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self.timed(super().fetchall)
+
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # The built-in shortcuts don't go through cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        execution = begin_sql_execution('COMMIT')
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            if execution is not None:
+                execution[1] += time.perf_counter() - start
+
+def summarize_sql_profile(executions):
+    """Return (executions and seconds by shape, most executed first; slow statements as (seconds, shape))"""
+    slow_seconds = app.config['SQL_PROFILER_SLOW_MS'] / 1000
+    shapes = {}
+    slow = []
+
+    for sql, seconds in executions:
+        shape = normalize_sql(sql)
+        totals = shapes.setdefault(shape, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+        if seconds > slow_seconds:
+            slow.append((seconds, shape))
+
+    by_count = sorted(shapes.items(), key=lambda item: item[1][0], reverse=True)
+    return by_count, slow
+
+if app.config['SQL_PROFILER_ENABLED']:
+    @app.before_request
+    def start_sql_profile():
+        sql_profile.executions = []
+
+    @app.after_request
+    def report_sql_profile(response):
+        executions = getattr(sql_profile, 'executions', None)
+        if executions is None:
+            return response
+        sql_profile.executions = None
+
+        shapes, slow = summarize_sql_profile(executions)
+
+        for shape, (count, seconds) in shapes:
+            if count <= app.config['SQL_PROFILER_REPEAT_THRESHOLD']:
+                break
+            print(f"Repeated SQL in {request.method} {request.path}: {count}x in {seconds * 1000:.1f} ms: {shape}")
+
+        for seconds, shape in slow:
+            print(f"Slow SQL in {request.method} {request.path}: {seconds * 1000:.1f} ms: {shape}")
+
+        if app.debug:
+            total_ms = sum(seconds for _, seconds in executions) * 1000
+            summary = f'{len(executions)} statements, {len(shapes)} distinct, {total_ms:.1f} ms'
+            if shapes:
+                summary += f'; most repeated {shapes[0][1][0]}x'
+            response.headers['X-SQL-Profile'] = summary
+
+        return response
+
+# ==========================================================
+# Schema Migrations
+# ==========================================================
+
+# Each migration runs exactly once, in order, and is recorded in schema_version.
+# Add new schema changes as a new migration at the end of MIGRATIONS; never edit
+# one that has already been released.
 
-    # Create tables
+def migrate_initial_schema(cursor):
+    # IF NOT EXISTS adopts databases created before migrations were tracked
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS hosts (
         id TEXT PRIMARY KEY,
@@ -176,11 +632,1159 @@ def init_db():
     )
     ''')
 
+def migrate_score_ledger(cursor):
+    # Score ledger: points banked by each team from finished holds
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS team_scores (
+        team_id TEXT PRIMARY KEY,
+        game_id TEXT NOT NULL,
+        banked_points INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (team_id) REFERENCES teams (id),
+        FOREIGN KEY (game_id) REFERENCES games (id)
+    )
+    ''')
+
+    # Score ledger: the team currently holding each base and since when
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS base_holders (
+        base_id TEXT PRIMARY KEY,
+        game_id TEXT NOT NULL,
+        team_id TEXT NOT NULL,
+        held_since INTEGER NOT NULL,
+        FOREIGN KEY (base_id) REFERENCES bases (id),
+        FOREIGN KEY (team_id) REFERENCES teams (id),
+        FOREIGN KEY (game_id) REFERENCES games (id)
+    )
+    ''')
+
+    # Build the ledger of existing games from their capture history
+    cursor.execute('SELECT * FROM games')
+    for game in cursor.fetchall():
+        rebuild_score_ledger(cursor, game)
+
+def migrate_game_versions(cursor):
+    # Databases created by unreleased builds may already have the column
+    cursor.execute('PRAGMA table_info(games)')
+    if 'version' not in [column['name'] for column in cursor.fetchall()]:
+        # Increased on every change to the game
+        cursor.execute('ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+def migrate_hot_path_indexes(cursor):
+    # Score replay and current owner: captures of a base in time order, without touching the table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_captures_base_time ON captures (base_id, capture_time, team_id)')
+
+    # Rosters in join order and player counts
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_team_join ON players (team_id, join_time)')
+
+    # Everything that belongs to a game or host
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_teams_game ON teams (game_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bases_game ON bases (game_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_games_host ON games (host_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_team_scores_game ON team_scores (game_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_base_holders_game ON base_holders (game_id)')
+
+    # qr_code lookups on hosts, teams and bases already use the indexes behind their UNIQUE constraints
+
+def migrate_capture_idempotency(cursor):
+    # Client-generated key of a capture, so a retried offline sync is only recorded once
+    cursor.execute('ALTER TABLE captures ADD COLUMN idempotency_key TEXT')
+
+    # When the player made the capture, as reported by their device
+    cursor.execute('ALTER TABLE captures ADD COLUMN client_time INTEGER')
+
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_captures_idempotency_key ON captures (idempotency_key)')
+
+def migrate_game_results(cursor):
+    # Final game details and scoreboard of each ended game, as zlib-compressed JSON.
+    # Games that ended before this table existed are frozen by rebuild-score-ledger.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS game_results (
+        game_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,  -- game version the results were frozen at
+        frozen_time INTEGER NOT NULL,
+        game_json BLOB NOT NULL,
+        scores_json BLOB NOT NULL,
+        FOREIGN KEY (game_id) REFERENCES games (id)
+    )
+    ''')
+
+def migrate_capture_throttle_settings(cursor):
+    # Per-game capture scan limits; NULL uses CAPTURE_SCANS_PER_MINUTE and CAPTURE_SCAN_BURST
+    cursor.execute('ALTER TABLE games ADD COLUMN capture_scans_per_minute INTEGER')
+    cursor.execute('ALTER TABLE games ADD COLUMN capture_scan_burst INTEGER')
+
+def migrate_change_versions(cursor):
+    # Game version at which each team and base last changed, so clients can fetch only what changed
+    cursor.execute('ALTER TABLE teams ADD COLUMN updated_version INTEGER NOT NULL DEFAULT 0')
+    cursor.execute('ALTER TABLE bases ADD COLUMN updated_version INTEGER NOT NULL DEFAULT 0')
+
+    # Every write changes its rows before bump_game_version, so a changed row gets the
+    # version the game is about to move to. A row changed after the bump is just sent again.
+    next_version = '(SELECT version + 1 FROM games WHERE id = {game})'
+    mark_team = 'UPDATE teams SET updated_version = ' + next_version.format(game='teams.game_id') + ' WHERE id = {team};'
+    mark_base = 'UPDATE bases SET updated_version = ' + next_version.format(game='bases.game_id') + ' WHERE id = {base};'
+
+    triggers = {
+        'teams_changed_insert': ('AFTER INSERT ON teams', mark_team.format(team='NEW.id')),
+        'teams_changed_update': ('AFTER UPDATE OF name, color, qr_code ON teams', mark_team.format(team='NEW.id')),
+        'bases_changed_insert': ('AFTER INSERT ON bases', mark_base.format(base='NEW.id')),
+        'bases_changed_update': ('AFTER UPDATE OF name, latitude, longitude, qr_code ON bases',
+                                 mark_base.format(base='NEW.id')),
+
+        # Rosters and player counts belong to the team
+        'players_changed_insert': ('AFTER INSERT ON players', mark_team.format(team='NEW.team_id')),
+        'players_changed_update': ('AFTER UPDATE OF team_id, name ON players',
+                                   mark_team.format(team='OLD.team_id') + mark_team.format(team='NEW.team_id')),
+        'players_changed_delete': ('AFTER DELETE ON players', mark_team.format(team='OLD.team_id')),
+
+        # The owner of a base
+        'holders_changed_insert': ('AFTER INSERT ON base_holders', mark_base.format(base='NEW.base_id')),
+        'holders_changed_update': ('AFTER UPDATE OF team_id ON base_holders', mark_base.format(base='NEW.base_id')),
+        'holders_changed_delete': ('AFTER DELETE ON base_holders', mark_base.format(base='OLD.base_id')),
+    }
+    for name, (event, body) in triggers.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+
+def migrate_base_layout_versions(cursor):
+    # Counts changes to what the spatial index of a game's bases is built from: the bases'
+    # names and positions and the capture radius, which sets the cell size. Captures and
+    # joins leave it alone, so the index survives them.
+    cursor.execute('ALTER TABLE games ADD COLUMN layout_version INTEGER NOT NULL DEFAULT 0')
+
+    bump_layout = 'UPDATE games SET layout_version = layout_version + 1 WHERE id = {game};'
+    triggers = {
+        'bases_layout_insert': ('AFTER INSERT ON bases', bump_layout.format(game='NEW.game_id')),
+        'bases_layout_update': ('AFTER UPDATE OF name, latitude, longitude ON bases',
+                                bump_layout.format(game='NEW.game_id')),
+        'bases_layout_delete': ('AFTER DELETE ON bases', bump_layout.format(game='OLD.game_id')),
+        'games_layout_radius': ('AFTER UPDATE OF capture_radius_meters ON games', bump_layout.format(game='NEW.id')),
+    }
+    for name, (event, body) in triggers.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+
+MIGRATIONS = [
+    (1, 'Initial schema', migrate_initial_schema),
+    (2, 'Score ledger', migrate_score_ledger),
+    (3, 'Game versions', migrate_game_versions),
+    (4, 'Indexes for hot query paths', migrate_hot_path_indexes),
+    (5, 'Capture idempotency keys', migrate_capture_idempotency),
+    (6, 'Final results of ended games', migrate_game_results),
+    (7, 'Per-game capture throttle settings', migrate_capture_throttle_settings),
+    (8, 'Change versions of teams and bases', migrate_change_versions),
+    (9, 'Base layout versions', migrate_base_layout_versions),
+]
+
+# Helper function to apply any migrations a database has not had yet
+def apply_migrations(conn):
+    """Return the list of migration versions applied"""
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_time INTEGER NOT NULL
+    )
+    ''')
     conn.commit()
+
+    # One writer at a time, so parallel worker processes don't both migrate
+    cursor.execute('BEGIN IMMEDIATE')
+    cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+    current_version = cursor.fetchone()[0]
+
+    applied = []
+    try:
+        for version, description, migrate in MIGRATIONS:
+            if version <= current_version:
+                continue
+
+            migrate(cursor)
+            cursor.execute('''
+            INSERT INTO schema_version (version, description, applied_time)
+            VALUES (?, ?, ?)
+            ''', (version, description, int(time.time())))
+            applied.append(version)
+
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    return applied
+
+# Migrate the database at startup
+def migrate_db():
+    conn = open_db_connection()
+    applied = apply_migrations(conn)
     conn.close()
 
-init_db()
+    if applied:
+        print(f"Applied database migrations: {', '.join(str(version) for version in applied)}")
+
+# ==========================================================
+# Hot Path Queries
+# ==========================================================
+
+# Active games first, then games in setup, then ended games, most recently started first.
+# Games not started yet tie on start time, so the creation time and the unique id keep
+# the order total and LIMIT/OFFSET pages from repeating or skipping games.
+GAME_LIST_ORDER = '''
+    CASE
+        WHEN {games}.status = 'active' THEN 1
+        WHEN {games}.status = 'setup' THEN 2
+        ELSE 3
+    END,
+    COALESCE({games}.start_time, 0) DESC,
+    {games}.created_time DESC,
+    {games}.id
+'''
+
+GAME_BY_ID_SQL = 'SELECT * FROM games WHERE id = ?'
+
+HOST_GAMES_SQL = f'''
+SELECT id, name, status, start_time, end_time,
+       (SELECT COUNT(*) FROM teams WHERE teams.game_id = games.id) AS team_count
+FROM games
+WHERE host_id = ?
+ORDER BY {GAME_LIST_ORDER.format(games='games')}
+'''
+
+GAME_TEAMS_SQL = '''
+SELECT t.*, COALESCE(s.banked_points, 0) AS banked_points
+FROM teams t
+LEFT JOIN team_scores s ON s.team_id = t.id
+WHERE t.game_id = ?
+ORDER BY t.rowid
+'''
+
+GAME_PLAYERS_SQL = '''
+SELECT p.id, p.team_id, p.name, p.join_time
+FROM players p
+JOIN teams t ON p.team_id = t.id
+WHERE t.game_id = ?
+ORDER BY p.join_time ASC, p.rowid
+'''
+
+GAME_BASES_SQL = 'SELECT * FROM bases WHERE game_id = ? ORDER BY rowid'
+
+GAME_PLAYER_COUNT_SQL = 'SELECT COUNT(*) FROM players WHERE team_id IN (SELECT id FROM teams WHERE game_id = ?)'
+
+# Captures of a game by base, in the order the score ledger replays them
+GAME_CAPTURE_HISTORY_SQL = '''
+SELECT c.base_id, c.team_id, c.capture_time FROM captures c
+JOIN bases b ON c.base_id = b.id
+WHERE b.game_id = ?
+ORDER BY c.base_id, c.capture_time, c.rowid
+'''
+
+# Captures of a game in time order, as the score timeline replays them
+GAME_CAPTURE_TIMELINE_SQL = '''
+SELECT c.base_id, c.team_id, c.capture_time FROM captures c
+JOIN bases b ON c.base_id = b.id
+WHERE b.game_id = ?
+ORDER BY c.capture_time, c.rowid
+'''
+
+CAPTURE_BASE_SQL = '''
+SELECT b.*, g.capture_radius_meters, g.points_interval_seconds, g.status,
+       g.capture_scans_per_minute, g.capture_scan_burst FROM bases b
+JOIN games g ON b.game_id = g.id
+WHERE b.id = ?
+'''
+
+CAPTURE_PLAYER_SQL = '''
+SELECT p.team_id, t.game_id FROM players p
+JOIN teams t ON p.team_id = t.id
+WHERE p.id = ?
+'''
+
+# Formatted with one placeholder per key
+CAPTURES_BY_IDEMPOTENCY_KEYS_SQL = '''
+SELECT idempotency_key, capture_time FROM captures
+WHERE idempotency_key IN ({keys})
+'''
+
+GAME_BASE_HOLDERS_SQL = 'SELECT base_id, team_id, held_since FROM base_holders WHERE game_id = ?'
+
+GAME_TEAM_SCORES_SQL = 'SELECT team_id, banked_points FROM team_scores WHERE game_id = ?'
+
+HOST_BY_QR_CODE_SQL = 'SELECT id, name, expiry_date FROM hosts WHERE qr_code = ?'
+
+TEAM_BY_QR_CODE_SQL = 'SELECT id, game_id FROM teams WHERE qr_code = ?'
+
+BASE_BY_QR_CODE_SQL = 'SELECT id, game_id FROM bases WHERE qr_code = ?'
+
+# Queries on the request hot paths that must be answered from an index. The handlers
+# run these same constants, so the plans checked here are the plans they get.
+HOT_QUERIES = [
+    ('game by id', GAME_BY_ID_SQL),
+    ('games of a host', HOST_GAMES_SQL),
+    ('teams of a game', GAME_TEAMS_SQL),
+    ('players of a game', GAME_PLAYERS_SQL),
+    ('bases of a game', GAME_BASES_SQL),
+    ('capture history of a game', GAME_CAPTURE_HISTORY_SQL),
+    ('capture timeline of a game', GAME_CAPTURE_TIMELINE_SQL),
+    ('player counts of a game', GAME_PLAYER_COUNT_SQL),
+    ('base of a capture', CAPTURE_BASE_SQL),
+    ('player of a capture', CAPTURE_PLAYER_SQL),
+    ('captures by idempotency key', CAPTURES_BY_IDEMPOTENCY_KEYS_SQL.format(keys='?')),
+    ('base holders of a game', GAME_BASE_HOLDERS_SQL),
+    ('team scores of a game', GAME_TEAM_SCORES_SQL),
+    ('host by QR code', HOST_BY_QR_CODE_SQL),
+    ('team by QR code', TEAM_BY_QR_CODE_SQL),
+    ('base by QR code', BASE_BY_QR_CODE_SQL),
+]
+
+# Helper function to find hot queries that fall back to a full table scan
+def find_table_scans(conn):
+    """Return (query name, plan detail) for each hot query step that scans a table"""
+    cursor = conn.cursor()
+    scans = []
+
+    for name, sql in HOT_QUERIES:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', (None,) * sql.count('?'))
+        for step in cursor.fetchall():
+            if step['detail'].startswith('SCAN'):
+                scans.append((name, step['detail']))
+
+    return scans
+
+# Helper function to check the hot queries against a freshly migrated schema
+def check_query_plans():
+    """Return find_table_scans for an empty database with every migration applied"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    try:
+        apply_migrations(conn)
+        return find_table_scans(conn)
+    finally:
+        conn.close()
+
+# Check the hot queries against a freshly migrated schema: flask --app flask_app check-query-plans
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if a hot query would scan a whole table instead of using an index."""
+    scans = check_query_plans()
+
+    for name, detail in scans:
+        click.echo(f'{name}: {detail}')
+
+    click.echo(f'Checked {len(HOT_QUERIES)} queries, {len(scans)} with table scans')
+
+    if scans:
+        raise SystemExit(1)
+
+
+# ==========================================================
+# Score Ledger
+# ==========================================================
+
+# Teams earn a point for every full points interval they hold a base. Instead
+# of replaying the capture history on every read, the ledger keeps the points
+# each team has banked from finished holds plus the current holder of each
+# base, so a live score is banked points plus the open holds measured to now.
+
+# Helper function to get the time scores are measured at
+def score_reference_time(game):
+    """Return the current time, or the end time once the game has ended"""
+    return game['end_time'] if game['status'] == 'ended' else int(time.time())
+
+# Helper function to add points to a team's banked total
+def bank_team_points(cursor, game_id, team_id, points):
+    cursor.execute('''
+    INSERT INTO team_scores (team_id, game_id, banked_points)
+    VALUES (?, ?, ?)
+    ON CONFLICT (team_id) DO UPDATE SET banked_points = banked_points + excluded.banked_points
+    ''', (team_id, game_id, points))
+
+# Helper function to apply a capture to the ledger
+def record_capture_in_ledger(cursor, game_id, base_id, team_id, capture_time, points_interval):
+    """Bank the previous holder's points for the base and make team_id the new holder.
+
+    Return False, changing nothing, if team_id already holds the base.
+    Must run in the same transaction as the INSERT into captures."""
+    cursor.execute('SELECT team_id, held_since FROM base_holders WHERE base_id = ?', (base_id,))
+    holder = cursor.fetchone()
+
+    if holder and holder['team_id'] == team_id:
+        return False
+
+    if holder:
+        points = (capture_time - holder['held_since']) // points_interval
+        bank_team_points(cursor, game_id, holder['team_id'], points)
+
+    cursor.execute('''
+    INSERT INTO base_holders (base_id, game_id, team_id, held_since)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (base_id) DO UPDATE SET team_id = excluded.team_id, held_since = excluded.held_since
+    ''', (base_id, game_id, team_id, capture_time))
+    return True
+
+# Helper function to recompute the ledger of a game from its capture history
+def replay_score_ledger(cursor, game):
+    """Return (banked points by team, (team, held_since) by base) from the captures table"""
+    cursor.execute(GAME_CAPTURE_HISTORY_SQL, (game['id'],))
+
+    points_interval = game['points_interval_seconds']
+    banked = {}
+    holders = {}
+
+    for capture in cursor.fetchall():
+        holder = holders.get(capture['base_id'])
+        if holder:
+            team_id, held_since = holder
+            banked[team_id] = banked.get(team_id, 0) + (capture['capture_time'] - held_since) // points_interval
+
+        holders[capture['base_id']] = (capture['team_id'], capture['capture_time'])
+
+    return banked, holders
+
+# Helper function to replace the stored ledger of a game with a fresh replay
+def rebuild_score_ledger(cursor, game):
+    banked, holders = replay_score_ledger(cursor, game)
+
+    cursor.execute('DELETE FROM team_scores WHERE game_id = ?', (game['id'],))
+    cursor.execute('DELETE FROM base_holders WHERE game_id = ?', (game['id'],))
+
+    cursor.executemany('''
+    INSERT INTO team_scores (team_id, game_id, banked_points) VALUES (?, ?, ?)
+    ''', [(team_id, game['id'], points) for team_id, points in banked.items()])
+
+    cursor.executemany('''
+    INSERT INTO base_holders (base_id, game_id, team_id, held_since) VALUES (?, ?, ?, ?)
+    ''', [(base_id, game['id'], team_id, held_since) for base_id, (team_id, held_since) in holders.items()])
+
+# Helper function to compare the stored ledger of a game with a fresh replay
+def find_score_ledger_drift(cursor, game):
+    """Return a list of human readable differences, empty if the ledger is correct"""
+    banked, holders = replay_score_ledger(cursor, game)
+
+    cursor.execute(GAME_TEAM_SCORES_SQL, (game['id'],))
+    stored_banked = {row['team_id']: row['banked_points'] for row in cursor.fetchall()}
+
+    cursor.execute(GAME_BASE_HOLDERS_SQL, (game['id'],))
+    stored_holders = {row['base_id']: (row['team_id'], row['held_since']) for row in cursor.fetchall()}
+
+    drift = []
+    for team_id in sorted(set(banked) | set(stored_banked)):
+        expected = banked.get(team_id, 0)
+        actual = stored_banked.get(team_id, 0)
+        if expected != actual:
+            drift.append(f'team {team_id}: banked {actual} points, history gives {expected}')
+
+    for base_id in sorted(set(holders) | set(stored_holders)):
+        expected = holders.get(base_id)
+        actual = stored_holders.get(base_id)
+        if expected != actual:
+            drift.append(f'base {base_id}: holder {actual}, history gives {expected}')
+
+    return drift
+
+migrate_db()
+
+# Rebuild or verify the score ledger: flask --app flask_app rebuild-score-ledger
+@app.cli.command('rebuild-score-ledger')
+@click.option('--verify-only', is_flag=True, help='Report drift without rewriting the ledger.')
+@click.option('--game', 'game_id', help='Only process this game.')
+def rebuild_score_ledger_command(verify_only, game_id):
+    """Recompute the score ledger from the captures table and report any drift."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    if game_id:
+        cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    else:
+        cursor.execute('SELECT * FROM games')
+    games = cursor.fetchall()
+
+    drifted_games = 0
+    frozen_games = 0
+    for game in games:
+        drift = find_score_ledger_drift(cursor, game)
+        if drift:
+            drifted_games += 1
+            click.echo(f"Game {game['id']}: {len(drift)} difference(s)")
+            for line in drift:
+                click.echo(f'  {line}')
+
+        if not verify_only:
+            rebuild_score_ledger(cursor, game)
+
+            # Cached snapshots and final results of the game still hold the old scores
+            if drift:
+                bump_game_version(cursor, game['id'])
+
+            # Also freezes ended games whose results are missing, since reads never write them
+            if game['status'] == 'ended' and (drift or not has_current_results(cursor, game)):
+                freeze_game_results(cursor, game['id'])
+                frozen_games += 1
+
+    conn.commit()
+
+    action = 'Verified' if verify_only else 'Rebuilt'
+    click.echo(f'{action} {len(games)} game(s), {drifted_games} with drift')
+    if frozen_games:
+        click.echo(f'Froze the final results of {frozen_games} ended game(s)')
+
+    if verify_only and drifted_games:
+        raise SystemExit(1)
+
+
+# ==========================================================
+# Game Snapshot Cache
+# ==========================================================
+
+# Bounded, thread-safe LRU cache of values tagged with the game version they were built from
+class LRUCache:
+    def __init__(self, max_entries, enabled=True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.entries = OrderedDict()  # key -> (version, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """Return the value cached for key at this version, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            # Never replace a newer value built by a concurrent request
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > version:
+                return
+
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+# Teams, players, bases and base ownership of recently requested games
+game_snapshot_cache = LRUCache(app.config['GAME_CACHE_MAX_ENTRIES'], app.config['GAME_CACHE_ENABLED'])
+
+# Decompressed final results of ended games
+game_results_cache = LRUCache(app.config['GAME_CACHE_MAX_ENTRIES'], app.config['GAME_CACHE_ENABLED'])
+
+# Score timelines of ended games, which can no longer change
+score_timeline_cache = LRUCache(app.config['GAME_CACHE_MAX_ENTRIES'], app.config['GAME_CACHE_ENABLED'])
+
+# ==========================================================
+# Response Compression
+# ==========================================================
+
+# JSON and text responses from /api/ of at least COMPRESSION_MIN_BYTES are
+# compressed with brotli (when installed) or gzip, whichever the client
+# prefers. Responses with an ETag come from a cached game version, so their
+# compressed bytes are cached by content and each version is compressed once
+# rather than on every poll. A compressed response's ETag becomes weak, as its
+# bytes differ from the identity encoding; If-None-Match uses weak comparison.
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain')
+
+# Encodings in order of preference when the client accepts several equally
+COMPRESSION_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Compressed bodies of versioned responses, keyed by encoding and a digest of the body
+compressed_body_cache = LRUCache(app.config['COMPRESSION_CACHE_MAX_ENTRIES'], app.config['COMPRESSION_ENABLED'])
+
+# Helper function to compress a response body
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=app.config['COMPRESSION_BROTLI_LEVEL'])
+    return gzip.compress(body, compresslevel=app.config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+if app.config['COMPRESSION_ENABLED']:
+    @app.after_request
+    def compress_response(response):
+        if not request.path.startswith('/api/') or response.is_streamed or 'Content-Encoding' in response.headers:
+            return response
+
+        # Caches must keep the encodings apart, including when revalidating
+        if response.status_code != 304 and response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        # The ETag is weak whenever the body may be sent compressed, so a 304 carries
+        # the same validator as the 200 it revalidates
+        encoding = request.accept_encodings.best_match(COMPRESSION_ENCODINGS)
+        etag, weak = response.get_etag()
+        if encoding is not None and etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+
+        if response.status_code == 304 or request.method == 'HEAD' or encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < app.config['COMPRESSION_MIN_BYTES']:
+            return response
+
+        if etag is None:
+            compressed = compress_body(body, encoding)
+        else:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = compressed_body_cache.get(key, 0)
+            if compressed is None:
+                compressed = compress_body(body, encoding)
+                compressed_body_cache.put(key, 0, compressed)
+
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+
+        if app.config['METRICS_ENABLED']:
+            metrics.observe_compression(encoding, len(body), len(compressed))
+
+        return response
+
+# ==========================================================
+# Capture Throttle
+# ==========================================================
+
+# Stops scan spam before it reaches the database. Each player has a token
+# bucket refilled at the game's scans per minute, up to its burst; a scan
+# with no token left gets 429. Each base also remembers its holder for
+# CAPTURE_HOLDER_TTL_SECONDS, along with the base's location, so a rescan by
+# the holding team within range is answered without a query. The holder is
+# remembered inside the write transaction that saw it, so cache updates
+# happen in commit order. Captures in this process update the cache straight
+# away; captures in other server processes are seen once the entry expires.
+# Offline captures synced in a batch are charged to the same bucket, replayed
+# at the times they were made, so a sync can't scan faster than a live player.
+
+# Seconds between sweeps of expired entries
+CAPTURE_THROTTLE_EVICTION_SECONDS = 60
+
+class PlayerBucket:
+    __slots__ = ('tokens', 'updated', 'rate', 'burst', 'team_id', 'team_seen')
+
+    def __init__(self, rate, burst, now):
+        self.tokens = burst
+        self.updated = now
+        self.rate = rate  # Tokens per second
+        self.burst = burst
+        self.team_id = None
+        self.team_seen = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class CaptureThrottle:
+    def __init__(self, holder_ttl, max_offline_seconds):
+        self.holder_ttl = holder_ttl
+        self.max_offline_seconds = max_offline_seconds
+        self.lock = threading.Lock()
+        self.players = {}  # player id -> PlayerBucket
+        self.holders = {}  # base id -> (team id, game id, expiry time, base row)
+        self.next_eviction = time.time() + CAPTURE_THROTTLE_EVICTION_SECONDS
+
+    def take_token(self, player_id, now):
+        """Spend one of the player's tokens; return seconds until the next one if none is left, else None.
+
+        Players not seen before always pass; see admit_player."""
+        with self.lock:
+            if now >= self.next_eviction:
+                self.evict_expired(now)
+
+            bucket = self.players.get(player_id)
+            if bucket is None:
+                return None
+
+            bucket.refill(now)
+            if bucket.tokens < 1:
+                return (1 - bucket.tokens) / bucket.rate
+
+            bucket.tokens -= 1
+            return None
+
+    def admit_player(self, player_id, team_id, rate, burst, now):
+        """Record the player's team and the limits of their game, after a scan has been validated"""
+        with self.lock:
+            bucket = self.players.get(player_id)
+            if bucket is None:
+                # The scan that created the bucket spends its first token
+                bucket = self.players[player_id] = PlayerBucket(rate, burst, now)
+                bucket.tokens -= 1
+            else:
+                bucket.refill(now)
+                bucket.rate = rate
+                bucket.burst = burst
+
+            bucket.team_id = team_id
+            bucket.team_seen = now
+
+    def admit_offline_scans(self, player_id, team_id, scan_times, rate, burst, now):
+        """Spend a token for each offline scan, in the order of the sorted scan_times; return
+        whether each scan was allowed.
+
+        The bucket is refilled up to each scan's time, but never moved back in time, so
+        scans replayed over time the bucket has already been charged for find no tokens."""
+        with self.lock:
+            bucket = self.players.get(player_id)
+            if bucket is None:
+                bucket = self.players[player_id] = PlayerBucket(rate, burst, scan_times[0] if scan_times else now)
+            bucket.rate = rate
+            bucket.burst = burst
+
+            allowed = []
+            for scan_time in scan_times:
+                bucket.refill(max(scan_time, bucket.updated))
+                allowed.append(bucket.tokens >= 1)
+                if allowed[-1]:
+                    bucket.tokens -= 1
+
+            bucket.refill(max(now, bucket.updated))
+            bucket.team_id = team_id
+            bucket.team_seen = now
+            return allowed
+
+    def held_by_players_team(self, player_id, base_id, now):
+        """Return the base's row if it was recently seen held by the player's team, else None"""
+        with self.lock:
+            bucket = self.players.get(player_id)
+            holder = self.holders.get(base_id)
+            if bucket is None or holder is None or bucket.team_id is None:
+                return None
+
+            if holder[0] == bucket.team_id and holder[2] > now and now - bucket.team_seen <= self.holder_ttl:
+                return holder[3]
+            return None
+
+    def remember_holder(self, base_data, team_id, now):
+        """Record the holder of a base; call from the write transaction that read or set it"""
+        with self.lock:
+            self.holders[base_data['id']] = (team_id, base_data['game_id'], now + self.holder_ttl, base_data)
+
+    def forget_holder(self, base_id):
+        with self.lock:
+            self.holders.pop(base_id, None)
+
+    def forget_player(self, player_id):
+        with self.lock:
+            bucket = self.players.get(player_id)
+            if bucket is not None:
+                bucket.team_id = None
+
+    def forget_game(self, game_id):
+        with self.lock:
+            for base_id in [base_id for base_id, holder in self.holders.items() if holder[1] == game_id]:
+                del self.holders[base_id]
+
+    def evict_expired(self, now):
+        """Drop expired holders and players whose bucket has refilled; the caller holds the lock.
+
+        Players are kept for as long as an offline scan can be backdated, so a new bucket
+        never replays scans over time an evicted one was already charged for."""
+        self.holders = {base_id: holder for base_id, holder in self.holders.items() if holder[2] > now}
+
+        for player_id in [player_id for player_id, bucket in self.players.items()
+                          if now - bucket.updated > max(bucket.burst / bucket.rate, self.holder_ttl,
+                                                        self.max_offline_seconds)]:
+            del self.players[player_id]
+
+        self.next_eviction = now + CAPTURE_THROTTLE_EVICTION_SECONDS
+
+capture_throttle = CaptureThrottle(app.config['CAPTURE_HOLDER_TTL_SECONDS'], app.config['CAPTURE_MAX_OFFLINE_SECONDS'])
+
+# Helper function to get the capture scan limits of a game
+def capture_scan_limits(game):
+    """Return (tokens per second, burst) for the game, falling back to the app defaults"""
+    scans_per_minute = game['capture_scans_per_minute'] or app.config['CAPTURE_SCANS_PER_MINUTE']
+    burst = game['capture_scan_burst'] or app.config['CAPTURE_SCAN_BURST']
+    return scans_per_minute / 60, burst
+
+# ==========================================================
+# Spatial Index of Bases
+# ==========================================================
+
+# On the same sphere as calculate_distance
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180
+
+# Grid of latitude/longitude cells holding the bases of one game
+class BaseGridIndex:
+    """Finds the bases within a distance of a point by visiting only the cells the circle can reach.
+
+    Cells are cell_size_meters tall; longitude cells divide 360 degrees exactly so that
+    indexes wrap cleanly across the antimeridian. Every candidate is checked with the exact
+    haversine distance, so the grid only decides which bases are looked at."""
+
+    def __init__(self, bases, cell_size_meters):
+        self.lat_cell_degrees = cell_size_meters / METERS_PER_DEGREE
+        self.lng_cells = max(1, math.ceil(360 / self.lat_cell_degrees))
+        self.lng_cell_degrees = 360 / self.lng_cells
+        self.bases = list(bases)
+        self.cells = {}  # (row, column) -> bases
+
+        for base in self.bases:
+            self.cells.setdefault(self.cell_of(base['lat'], base['lng']), []).append(base)
+
+    def row_of(self, lat):
+        return math.floor((lat + 90) / self.lat_cell_degrees)
+
+    def column_of(self, lng):
+        return math.floor(((lng + 180) % 360) / self.lng_cell_degrees) % self.lng_cells
+
+    def cell_of(self, lat, lng):
+        return self.row_of(lat), self.column_of(lng)
+
+    def candidates(self, lat, lng, radius_meters):
+        """Return the bases in every cell the circle overlaps"""
+        # Angular radius, padded a little against rounding at cell edges
+        radius_degrees = math.degrees(radius_meters / EARTH_RADIUS_METERS) * (1 + 1e-9) + 1e-9
+
+        rows = range(self.row_of(max(lat - radius_degrees, -90)), self.row_of(min(lat + radius_degrees, 90)) + 1)
+
+        # The longitude span of a circle widens towards the poles, and covers every
+        # longitude once the circle reaches a pole
+        radius_radians = math.radians(radius_degrees)
+        if radius_radians >= math.pi / 2 or math.sin(radius_radians) >= math.cos(math.radians(lat)):
+            columns = range(self.lng_cells)
+        else:
+            lng_degrees = math.degrees(math.asin(math.sin(radius_radians) / math.cos(math.radians(lat))))
+            first = math.floor((lng - lng_degrees + 180) / self.lng_cell_degrees)
+            last = math.floor((lng + lng_degrees + 180) / self.lng_cell_degrees)
+            if last - first + 1 >= self.lng_cells:
+                columns = range(self.lng_cells)
+            else:
+                columns = [column % self.lng_cells for column in range(first, last + 1)]
+
+        # A circle spanning more cells than there are bases is quicker to check base by base
+        if len(rows) * len(columns) > len(self.cells):
+            return self.bases
+
+        found = []
+        for row in rows:
+            for column in columns:
+                found.extend(self.cells.get((row, column), ()))
+        return found
+
+    def within(self, lat, lng, radius_meters):
+        """Return [(distance in meters, base)] for bases within radius_meters, nearest first"""
+        # A wide radius can reach every base of the game, so the distances are computed in bulk
+        candidates = self.candidates(lat, lng, radius_meters)
+        distances = distances_to_point(lat, lng, [(base['lat'], base['lng']) for base in candidates])
+
+        nearby = [(distance, base) for distance, base in zip(distances, candidates) if distance <= radius_meters]
+        nearby.sort(key=lambda entry: entry[0])
+        return nearby
+
+# Grid indexes of recently queried games, rebuilt when the game's base layout changes
+base_index_cache = LRUCache(app.config['GAME_CACHE_MAX_ENTRIES'], app.config['GAME_CACHE_ENABLED'])
+
+# Helper function to get the spatial index of a game's bases
+def load_base_index(cursor, game, snapshot):
+    """Return the index of the bases in snapshot. Their owners change with every capture,
+    so they are left to be read from the snapshot."""
+    index = base_index_cache.get(game['id'], game['layout_version'])
+    if index is None:
+        # Cells the size of the capture radius keep a capture check to a few cells
+        bases = [{'id': base['id'], 'name': base['name'], 'lat': base['lat'], 'lng': base['lng']}
+                 for base in snapshot['bases']]
+        index = BaseGridIndex(bases, max(game['capture_radius_meters'], 5))
+        base_index_cache.put(game['id'], game['layout_version'], index)
+    return index
+
+# ==========================================================
+# Write Queue
+# ==========================================================
+
+# Captures and joins arrive in bursts, and SQLite commits one transaction at
+# a time, each with its own fsync. Instead of every request committing on its
+# own, handlers hand their write to a single writer thread and wait for it.
+# The writer takes every write queued by then (waiting up to
+# WRITE_BATCH_DELAY_MS for more), runs each under its own savepoint so a
+# failing write rolls back alone, and commits the batch once. A request
+# waits at most WRITE_TIMEOUT_SECONDS for its write; a write that hasn't
+# started by then is dropped and the request gets the same 503 as a full
+# queue. The writer survives failed batches, and a dead writer thread is
+# restarted by the next write.
+
+# Bounds of the batch size histogram
+WRITE_BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+class WriteQueueFull(Exception):
+    pass
+
+# Helper function to count the statements of a queued write in the request that queued it
+def add_queued_write_statements(future):
+    """The writer runs each write's statements on its own thread and leaves them on the
+    future; the BEGIN and COMMIT shared by its batch are not counted."""
+    request_metrics.sql_statements = getattr(request_metrics, 'sql_statements', 0) + getattr(future, 'sql_statements', 0)
+
+    executions = getattr(sql_profile, 'executions', None)
+    if executions is not None:
+        executions.extend(getattr(future, 'sql_executions', None) or ())
+
+class GroupCommitWriter:
+    STOP = object()
+
+    def __init__(self, max_pending, max_batch, delay_seconds, timeout_seconds):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.max_batch = max_batch
+        self.delay_seconds = delay_seconds
+        self.timeout_seconds = timeout_seconds
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = False
+
+        # Metrics, updated under the lock
+        self.batch_sizes = Histogram(WRITE_BATCH_SIZE_BUCKETS)
+        self.commit_seconds = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.restarts = 0
+
+    def submit(self, write):
+        """Run write(cursor) in the writer's next transaction and return its result.
+
+        Raises WriteQueueFull if too many writes are already waiting or the
+        write times out, and re-raises any exception raised by write, whose
+        changes are then undone."""
+        future = Future()
+
+        with self.lock:
+            if self.stopping:
+                self.rejected += 1
+                raise WriteQueueFull()
+            if self.thread is None or not self.thread.is_alive():
+                if self.thread is not None:
+                    self.restarts += 1
+                    print('Write queue thread had stopped; restarting it')
+                self.thread = threading.Thread(target=self.run, name='group-commit-writer', daemon=True)
+                self.thread.start()
+
+        try:
+            self.queue.put_nowait((write, future))
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise WriteQueueFull()
+
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            # A write that hasn't started is dropped; one already running may still commit
+            future.cancel()
+            with self.lock:
+                self.timed_out += 1
+            raise WriteQueueFull()
+        finally:
+            add_queued_write_statements(future)
+
+    def next_batch(self):
+        """Return the next writes to commit together, and whether the writer should stop after them"""
+        first = self.queue.get()
+        if first is self.STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.delay_seconds
+        while len(batch) < self.max_batch:
+            try:
+                item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is self.STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def run(self):
+        conn = None
+        stop = False
+        while not stop:
+            batch, stop = self.next_batch()
+
+            # Writes whose request has given up waiting are skipped
+            batch = [(write, future) for write, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                if conn is None:
+                    conn = open_db_connection()
+                self.commit_batch(conn, batch)
+            except Exception as e:
+                print(f"Write queue batch of {len(batch)} failed: {e}")
+                with self.lock:
+                    self.failed += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+                # Start the next batch on a fresh connection
+                if conn is not None:
+                    conn.close()
+                    conn = None
+
+        if conn is not None:
+            conn.close()
+
+    def commit_batch(self, conn, batch):
+        outcomes = []
+        start = time.perf_counter()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            for write, future in batch:
+                # Count and profile each write's statements for the request that queued it
+                request_metrics.sql_statements = 0
+                sql_profile.executions = [] if app.config['SQL_PROFILER_ENABLED'] else None
+
+                cursor.execute('SAVEPOINT queued_write')
+                try:
+                    outcomes.append((future, write(cursor), None))
+                    cursor.execute('RELEASE queued_write')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO queued_write')
+                    cursor.execute('RELEASE queued_write')
+                    outcomes.append((future, None, e))
+
+                future.sql_statements = request_metrics.sql_statements
+                future.sql_executions = sql_profile.executions
+            sql_profile.executions = None
+            conn.commit()
+        except Exception as e:
+            # Nothing was committed, so every write in the batch failed
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(future, None, e) for _, future in batch]
+
+        with self.lock:
+            self.batch_sizes.observe(len(batch))
+            self.commit_seconds.observe(time.perf_counter() - start)
+            self.failed += sum(1 for _, _, error in outcomes if error is not None)
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stop(self):
+        """Commit the writes already queued, then stop the writer thread"""
+        with self.lock:
+            self.stopping = True
+            thread = self.thread
+
+        if thread is not None:
+            self.queue.put(self.STOP)
+            thread.join()
+
+    def render_metrics(self):
+        """Return the writer's metrics as Prometheus text lines"""
+        with self.lock:
+            lines = [
+                '# HELP qr_conquest_write_queue_depth Writes waiting for the writer thread.',
+                '# TYPE qr_conquest_write_queue_depth gauge',
+                f'qr_conquest_write_queue_depth {self.queue.qsize()}',
+                '# HELP qr_conquest_write_queue_rejected_total Writes refused because the queue was full.',
+                '# TYPE qr_conquest_write_queue_rejected_total counter',
+                f'qr_conquest_write_queue_rejected_total {self.rejected}',
+                '# HELP qr_conquest_write_queue_failed_total Queued writes that raised an error.',
+                '# TYPE qr_conquest_write_queue_failed_total counter',
+                f'qr_conquest_write_queue_failed_total {self.failed}',
+                '# HELP qr_conquest_write_queue_timed_out_total Writes whose request gave up waiting for the writer.',
+                '# TYPE qr_conquest_write_queue_timed_out_total counter',
+                f'qr_conquest_write_queue_timed_out_total {self.timed_out}',
+                '# HELP qr_conquest_write_queue_restarts_total Times the writer thread was found stopped and restarted.',
+                '# TYPE qr_conquest_write_queue_restarts_total counter',
+                f'qr_conquest_write_queue_restarts_total {self.restarts}',
+                '# HELP qr_conquest_write_batch_size Writes committed together in one transaction.',
+                '# TYPE qr_conquest_write_batch_size histogram',
+            ]
+            lines.extend(self.batch_sizes.render('qr_conquest_write_batch_size', 'queue="captures"'))
+            lines.append('# HELP qr_conquest_write_batch_seconds Time to apply and commit a batch.')
+            lines.append('# TYPE qr_conquest_write_batch_seconds histogram')
+            lines.extend(self.commit_seconds.render('qr_conquest_write_batch_seconds', 'queue="captures"'))
+        return lines
+
+write_queue = GroupCommitWriter(
+    app.config['WRITE_QUEUE_MAX_PENDING'],
+    app.config['WRITE_BATCH_MAX_SIZE'],
+    app.config['WRITE_BATCH_DELAY_MS'] / 1000,
+    app.config['WRITE_TIMEOUT_SECONDS']
+)
+atexit.register(write_queue.stop)
+
+# Helper function to apply a write, through the write queue when it is enabled
+def perform_write(write):
+    """Run write(cursor) in a write transaction, commit it and return its result.
+
+    Raises WriteQueueFull when the write queue is full."""
+    if app.config['WRITE_QUEUE_ENABLED']:
+        return write_queue.submit(write)
 
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        result = write(cursor)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return result
+
+# Helper function to build the response to a write refused by a full queue
+def write_queue_full_error():
+    response = jsonify({'error': 'The server is busy, please try again'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+# Raised by a queued write whose game changed status after the request checked it
+class GameStatusChanged(Exception):
+    def __init__(self, status):
+        super().__init__(f'Game is now {status}')
+        self.status = status
+
+# Helper function to check the status of a game again from inside a write
+def require_game_status(cursor, game_id, statuses):
+    """Raise GameStatusChanged unless the game's status is one of statuses.
+
+    A queued write runs after the request has checked the game, so a write
+    that must not land in an ended game checks again in its own transaction."""
+    cursor.execute('SELECT status FROM games WHERE id = ?', (game_id,))
+    status = cursor.fetchone()['status']
+    if status not in statuses:
+        raise GameStatusChanged(status)
 
 # API Routes
 
@@ -212,7 +1816,6 @@ def get_hosts():
             'creation_date': host['creation_date']
         })
 
-    conn.close()
     return jsonify(result)
 
 @app.route('/api/hosts', methods=['POST'])
@@ -239,11 +1842,8 @@ def create_host():
 
         conn.commit()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
-    conn.close()
-
     return jsonify({
         'id': host_id,
         'name': name,
@@ -267,7 +1867,6 @@ def update_host(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     # Update fields
@@ -283,11 +1882,8 @@ def update_host(host_id):
 
         conn.commit()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
-    conn.close()
-
     return jsonify({
         'id': host_id,
         'name': name,
@@ -307,7 +1903,6 @@ def delete_host(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     # Check if host has any games
@@ -315,20 +1910,139 @@ def delete_host(host_id):
     game_count = cursor.fetchone()[0]
 
     if game_count > 0:
-        conn.close()
         return jsonify({'error': 'Cannot delete host with active games'}), 400
 
     try:
         cursor.execute('DELETE FROM hosts WHERE id = ?', (host_id,))
         conn.commit()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
-    conn.close()
-
     return jsonify({'success': True})
 
+# List games of all hosts with their team, base and player counts
+@app.route('/api/admin/games', methods=['GET'])
+@require_site_admin
+def get_admin_games():
+    status = request.args.get('status')
+    host_id = request.args.get('host_id')
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+
+    if status is not None and status not in ('setup', 'active', 'ended'):
+        return jsonify({'error': 'Status must be setup, active or ended'}), 400
+
+    if page < 1 or not (1 <= per_page <= 200):
+        return jsonify({'error': 'Page must be at least 1 and per_page between 1 and 200'}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Game counts by status for the host filter, so the panel can show totals for every tab
+    host_filter = 'WHERE host_id = ?' if host_id else ''
+    host_params = [host_id] if host_id else []
+
+    cursor.execute(f'SELECT status, COUNT(*) FROM games {host_filter} GROUP BY status', host_params)
+    status_counts = {row[0]: row[1] for row in cursor.fetchall()}
+
+    filters = []
+    params = []
+    if host_id:
+        filters.append('host_id = ?')
+        params.append(host_id)
+    if status:
+        filters.append('status = ?')
+        params.append(status)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+
+    # Counts are grouped over the games of this page only
+    cursor.execute(f'''
+    WITH page AS (
+        SELECT * FROM games
+        {where}
+        ORDER BY {GAME_LIST_ORDER.format(games='games')}
+        LIMIT ? OFFSET ?
+    )
+    SELECT page.id, page.name, page.status, page.start_time, page.end_time, page.created_time,
+           page.host_id, h.name AS host_name, h.qr_code AS host_qr_code,
+           COALESCE(t.teams_count, 0) AS teams_count,
+           COALESCE(t.players_count, 0) AS players_count,
+           COALESCE(b.bases_count, 0) AS bases_count
+    FROM page
+    JOIN hosts h ON page.host_id = h.id
+    LEFT JOIN (
+        SELECT teams.game_id, COUNT(DISTINCT teams.id) AS teams_count, COUNT(players.id) AS players_count
+        FROM teams
+        LEFT JOIN players ON players.team_id = teams.id
+        WHERE teams.game_id IN (SELECT id FROM page)
+        GROUP BY teams.game_id
+    ) t ON t.game_id = page.id
+    LEFT JOIN (
+        SELECT game_id, COUNT(*) AS bases_count
+        FROM bases
+        WHERE game_id IN (SELECT id FROM page)
+        GROUP BY game_id
+    ) b ON b.game_id = page.id
+    ORDER BY {GAME_LIST_ORDER.format(games='page')}
+    ''', params + [per_page, (page - 1) * per_page])
+
+    games = [dict(game) for game in cursor.fetchall()]
+    total = status_counts.get(status, 0) if status else sum(status_counts.values())
+
+    return jsonify({
+        'games': games,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'status_counts': status_counts
+    })
+
+# Request, database and cache metrics in the Prometheus text format
+@app.route('/api/admin/metrics', methods=['GET'])
+@require_site_admin
+def get_metrics():
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+
+    lines = metrics.render()
+
+    lines += [
+        '# HELP qr_conquest_db_connections_opened_total SQLite connections opened by the pool.',
+        '# TYPE qr_conquest_db_connections_opened_total counter',
+        f'qr_conquest_db_connections_opened_total {db_pool.opened}',
+        '# HELP qr_conquest_db_connections_idle Connections waiting in the pool.',
+        '# TYPE qr_conquest_db_connections_idle gauge',
+        f'qr_conquest_db_connections_idle {db_pool.idle.qsize()}',
+    ]
+
+    caches = {
+        'game_snapshot': game_snapshot_cache,
+        'game_results': game_results_cache,
+        'score_timeline': score_timeline_cache,
+        'base_index': base_index_cache,
+        'compressed_body': compressed_body_cache,
+    }
+    cache_stats = {name: cache.stats() for name, cache in caches.items()}
+    for stat, kind in (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'), ('entries', 'gauge')):
+        name = f'qr_conquest_cache_{stat}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# HELP {name} Game cache {stat}, by cache.')
+        lines.append(f'# TYPE {name} {kind}')
+        for cache_name, stats in cache_stats.items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {stats[stat]}')
+
+    if app.config['WRITE_QUEUE_ENABLED']:
+        lines += write_queue.render_metrics()
+
+    with game_event_broker.condition:
+        subscribers = sum(len(game_subscribers) for game_subscribers in game_event_broker.subscribers.values())
+    lines += [
+        '# HELP qr_conquest_event_stream_subscribers Open game event streams.',
+        '# TYPE qr_conquest_event_stream_subscribers gauge',
+        f'qr_conquest_event_stream_subscribers {subscribers}',
+    ]
+
+    return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
 # Host verification endpoint
 @app.route('/api/hosts/verify/<qr_code>', methods=['GET'])
 def verify_host(qr_code):
@@ -339,20 +2053,16 @@ def verify_host(qr_code):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Invalid host QR code'}), 404
 
     # Check expiry
     if host['expiry_date'] and host['expiry_date'] < int(time.time()):
-        conn.close()
         return jsonify({
             'status': 'expired',
             'host_id': host['id'],
             'name': host['name']
         })
 
-    conn.close()
-
     return jsonify({
         'status': 'valid',
         'host_id': host['id'],
@@ -398,6 +2108,17 @@ def validate_game_settings(capture_radius, points_interval, game_duration, game_
 
     return None  # No validation errors
 
+# Helper function to validate the capture scan limits of a game
+def validate_capture_scan_limits(scans_per_minute, burst):
+    """Return an error message if either limit is invalid; None means the app default"""
+    if scans_per_minute is not None and not (isinstance(scans_per_minute, int) and 1 <= scans_per_minute <= 600):
+        return 'Capture scans per minute must be a whole number between 1 and 600'
+
+    if burst is not None and not (isinstance(burst, int) and 1 <= burst <= 100):
+        return 'Capture scan burst must be a whole number between 1 and 100'
+
+    return None
+
 @app.route('/api/games', methods=['POST'])
 def create_game():
     data = request.json
@@ -415,11 +2136,9 @@ def create_game():
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Invalid host ID'}), 400
 
     if host['expiry_date'] and host['expiry_date'] < int(time.time()):
-        conn.close()
         return jsonify({'error': 'Host account has expired'}), 400
 
     game_id = generate_unique_game_code()
@@ -429,28 +2148,30 @@ def create_game():
     points_interval = data.get('points_interval_seconds', 15)
     auto_start_time = data.get('auto_start_time')  # Can be None
     game_duration = data.get('game_duration_minutes')  # Can be None
+    scans_per_minute = data.get('capture_scans_per_minute')  # None uses the app default
+    scan_burst = data.get('capture_scan_burst')  # None uses the app default
 
     # Validate settings
-    validation_error = validate_game_settings(capture_radius, points_interval, game_duration)
+    validation_error = (validate_game_settings(capture_radius, points_interval, game_duration)
+                        or validate_capture_scan_limits(scans_per_minute, scan_burst))
     if validation_error:
-        conn.close()
         return jsonify({'error': validation_error}), 400
 
     if auto_start_time is not None and auto_start_time <= int(time.time()):
-        conn.close()
         return jsonify({'error': 'Auto-start time must be in the future'}), 400
 
     current_time = int(time.time())
 
     cursor.execute('''
     INSERT INTO games (id, host_id, name, status, capture_radius_meters, points_interval_seconds,
-                      auto_start_time, game_duration_minutes, created_time)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                      auto_start_time, game_duration_minutes, capture_scans_per_minute, capture_scan_burst,
+                      created_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (game_id, host_id, data['name'], 'setup', capture_radius, points_interval,
-          auto_start_time, game_duration, current_time))
+          auto_start_time, game_duration, scans_per_minute, scan_burst, current_time))
 
     conn.commit()
-    conn.close()
+    lifecycle_scheduler.schedule(game_id, auto_start_time)
 
     return jsonify({'game_id': game_id}), 201
 
@@ -465,17 +2186,19 @@ def update_game_settings(game_id):
     cursor = conn.cursor()
 
     # Verify game exists and host is authorized
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
     # Extract current settings for validation
     capture_radius = data.get('capture_radius_meters', game['capture_radius_meters'])
     points_interval = data.get('points_interval_seconds', game['points_interval_seconds'])
@@ -490,7 +2213,13 @@ def update_game_settings(game_id):
         start_time=game['start_time']
     )
     if validation_error:
-        conn.close()
+        return jsonify({'error': validation_error}), 400
+
+    validation_error = validate_capture_scan_limits(
+        data.get('capture_scans_per_minute', game['capture_scans_per_minute']),
+        data.get('capture_scan_burst', game['capture_scan_burst'])
+    )
+    if validation_error:
         return jsonify({'error': validation_error}), 400
 
     # Extract and validate individual settings
@@ -512,7 +2241,6 @@ def update_game_settings(game_id):
     if 'auto_start_time' in data:
         auto_start_time = data['auto_start_time']
         if auto_start_time is not None and auto_start_time <= int(time.time()):
-            conn.close()
             return jsonify({'error': 'Auto-start time must be in the future'}), 400
         update_fields.append('auto_start_time = ?')
         params.append(auto_start_time)
@@ -521,8 +2249,13 @@ def update_game_settings(game_id):
         update_fields.append('game_duration_minutes = ?')
         params.append(data['game_duration_minutes'])
 
+    # Null restores the app default
+    for field in ('capture_scans_per_minute', 'capture_scan_burst'):
+        if field in data:
+            update_fields.append(f'{field} = ?')
+            params.append(data[field])
+
     if not update_fields:
-        conn.close()
         return jsonify({'error': 'No settings to update'}), 400
 
     params.append(game_id)
@@ -532,14 +2265,41 @@ def update_game_settings(game_id):
         params
     )
 
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    updated_game = cursor.fetchone()
+
+    # Banked points were counted with the old interval, so recount them
+    if points_interval != game['points_interval_seconds']:
+        rebuild_score_ledger(cursor, updated_game)
+
+    bump_game_version(cursor, game_id)
+
     conn.commit()
-    conn.close()
+    notify_game_changed(game_id, 'settings')
+
+    # The auto-start time or duration may have moved
+    lifecycle_scheduler.schedule_game(updated_game)
 
     return jsonify({'success': True})
 
+# Sections of get_game that ?fields= can select; players are the rosters inside teams
+GAME_SECTIONS = ('teams', 'players', 'bases')
+
 # Get game details
 @app.route('/api/games/<game_id>', methods=['GET'])
 def get_game(game_id):
+    # Parse the optional sections and the version the client already has
+    fields = GAME_SECTIONS
+    if 'fields' in request.args:
+        requested = set(request.args['fields'].split(','))
+        if not requested <= set(GAME_SECTIONS):
+            return jsonify({'error': f"Fields must be a comma-separated list of {', '.join(GAME_SECTIONS)}"}), 400
+        fields = tuple(field for field in GAME_SECTIONS if field in requested)
+
+    since = request.args.get('since', type=int)
+    if 'since' in request.args and (since is None or since < 0):
+        return jsonify({'error': 'Since must be a game version (a non-negative integer)'}), 400
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -553,193 +2313,346 @@ def get_game(game_id):
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
-    # Get teams
-    cursor.execute('SELECT * FROM teams WHERE game_id = ?', (game_id,))
-    teams_data = cursor.fetchall()
-    teams = []
-
-    for team in teams_data:
-        # Get players with their names
-        cursor.execute('SELECT id, name, join_time FROM players WHERE team_id = ? ORDER BY join_time ASC', (team['id'],))
-        players_data = cursor.fetchall()
-
-        players = []
-        for player in players_data:
-            players.append({
-                'id': player['id'],
-                'name': player['name'],
-                'joinTime': player['join_time']
-            })
-
+    # A version newer than the game's can't be a delta; send everything
+    if since is not None and since > game['version']:
+        since = None
+
+    # Ended games are served from their frozen final results; other sections or a
+    # delta are built from the final state the same way as for a live game
+    if game['status'] == 'ended':
+        if fields == GAME_SECTIONS and since is None:
+            game_json, _ = load_game_results(cursor, game)
+        else:
+            game_json = json_body(build_game_details(game, load_game_snapshot(cursor, game), fields, since))
+        return final_results_response(game_json, f"game.{'.'.join(fields)}", game)
+
+    # Teams, players, bases and ownership, from the cache while the version is unchanged
+    snapshot = load_game_snapshot(cursor, game)
+
+    # Nothing to send if the client already has this version of the game. The ETag
+    # names the game state rather than the delta, so it holds whichever since was asked.
+    etag, valid_until = game_state_etag(f"game.{'.'.join(fields)}", game, snapshot['holds'])
+    if request.if_none_match.contains_weak(etag):
+        return add_game_state_headers(app.response_class(status=304), etag, game, valid_until)
+
+    response = jsonify(build_game_details(game, snapshot, fields, since))
+
+    return add_game_state_headers(response, etag, game, valid_until)
+
+# Helper function to build the details of a game as returned by get_game
+def build_game_details(game, snapshot, fields=GAME_SECTIONS, since=None):
+    """Return the game as sent by get_game; game must include host_name.
+
+    fields selects the sections of GAME_SECTIONS to include. With since, only the
+    teams and bases changed after that version are included, along with the ids of
+    all teams and bases and the score of every team."""
+    # Only the scores depend on the time of the request
+    scores = calculate_team_scores(
+        game,
+        {team['id']: team['banked_points'] for team in snapshot['teams']},
+        snapshot['holds']
+    )
 
-        # Calculate team score (fixed logic)
-        team_score = calculate_team_score(cursor, team['id'], game)
+    teams = []
+    for team in snapshot['teams']:
+        if since is not None and snapshot['team_versions'][team['id']] <= since:
+            continue
 
-        teams.append({
+        details = {
             'id': team['id'],
             'name': team['name'],
             'color': team['color'],
-            'qrCode': team['qr_code'],
-            'playerCount': len(players),
-            'players': players,
-            'score': team_score,
-        })
-
-    # Get bases
-    cursor.execute('SELECT * FROM bases WHERE game_id = ?', (game_id,))
-    bases_data = cursor.fetchall()
-    bases = []
+            'qrCode': team['qrCode'],
+            'playerCount': len(team['players']),
+            'score': scores[team['id']],
+        }
+        if 'players' in fields:
+            details['players'] = team['players']
+        teams.append(details)
 
-    for base in bases_data:
-        # Get current owner (most recent capture)
-        cursor.execute('''
-        SELECT team_id FROM captures
-        WHERE base_id = ?
-        ORDER BY capture_time DESC
-        LIMIT 1
-        ''', (base['id'],))
+    bases = snapshot['bases']
+    if since is not None:
+        bases = [base for base in bases if snapshot['base_versions'][base['id']] > since]
 
-        owner_data = cursor.fetchone()
-        owner = owner_data['team_id'] if owner_data else None
+    # Calculate end time if duration is set
+    calculated_end_time = None
+    if game['start_time'] and game['game_duration_minutes']:
+        calculated_end_time = game['start_time'] + (game['game_duration_minutes'] * 60)
+
+    details = {
+        'id': game['id'],
+        'name': game['name'],
+        'status': game['status'],
+        'hostName': game['host_name'],
+        'version': game['version'],
+        'settings': {
+            'capture_radius_meters': game['capture_radius_meters'],
+            'points_interval_seconds': game['points_interval_seconds'],
+            'auto_start_time': game['auto_start_time'],
+            'game_duration_minutes': game['game_duration_minutes'],
+            'calculated_end_time': calculated_end_time,
+            'capture_scans_per_minute': game['capture_scans_per_minute'],
+            'capture_scan_burst': game['capture_scan_burst']
+        }
+    }
+
+    if 'teams' in fields or 'players' in fields:
+        details['teams'] = teams
+    if 'bases' in fields:
+        details['bases'] = bases
+
+    # A delta also lists what still exists, so removed teams and bases can be dropped
+    if since is not None:
+        details['since'] = since
+        details['teamIds'] = [team['id'] for team in snapshot['teams']]
+        details['baseIds'] = [base['id'] for base in snapshot['bases']]
+        details['scores'] = scores
+
+    return details
+
+# Helper function to calculate the scores of all teams in a game
+def calculate_team_scores(game, banked_points, holds):
+    """Return scores by team id.
+
+    banked_points maps team id to the points in the score ledger and holds
+    lists (team_id, held_since) for every base that is currently held."""
+    scores = dict(banked_points)
+
+    # Calculate current time or end time if game is over
+    current_time = score_reference_time(game)
+
+    # Get the points interval from game settings
+    points_interval = game['points_interval_seconds']
 
+    # Add the points from bases that are still being held
+    for team_id, held_since in holds:
+        scores[team_id] = scores.get(team_id, 0) + (current_time - held_since) // points_interval
+
+    return scores
+
+# Helper function to load the parts of a game that only change with its version
+def load_game_snapshot(cursor, game, cache=True):
+    """Return the teams (with players and banked points), bases, base holds, base owners and change versions of a game.
+
+    Scores are left out as they depend on the time; see calculate_team_scores. Pass cache=False
+    inside a transaction that has not committed yet, so its state never reaches the shared cache."""
+    game_id = game['id']
+
+    if cache:
+        snapshot = game_snapshot_cache.get(game_id, game['version'])
+        if snapshot is not None:
+            return snapshot
+
+    # Get the current holder of each base from the score ledger
+    cursor.execute(GAME_BASE_HOLDERS_SQL, (game_id,))
+    holders = {hold['base_id']: (hold['team_id'], hold['held_since']) for hold in cursor.fetchall()}
+
+    # Get teams with the points they have banked in the score ledger
+    cursor.execute(GAME_TEAMS_SQL, (game_id,))
+    teams_data = cursor.fetchall()
+
+    # Get players of all teams in one query, grouped by team below
+    cursor.execute(GAME_PLAYERS_SQL, (game_id,))
+
+    players_by_team = {}
+    for player in cursor.fetchall():
+        players_by_team.setdefault(player['team_id'], []).append({
+            'id': player['id'],
+            'name': player['name'],
+            'joinTime': player['join_time']
+        })
+
+    # Get bases
+    cursor.execute(GAME_BASES_SQL, (game_id,))
+    bases_data = cursor.fetchall()
+
+    teams = []
+    for team in teams_data:
+        teams.append({
+            'id': team['id'],
+            'name': team['name'],
+            'color': team['color'],
+            'qrCode': team['qr_code'],
+            'players': players_by_team.get(team['id'], []),
+            'banked_points': team['banked_points']
+        })
+
+    bases = []
+    for base in bases_data:
         bases.append({
             'id': base['id'],
             'name': base['name'],
             'lat': base['latitude'],
             'lng': base['longitude'],
-            'ownedBy': owner,
+            'ownedBy': holders[base['id']][0] if base['id'] in holders else None,
             'qrCode': base['qr_code']
         })
 
-# Check for auto-start
-    current_time = int(time.time())
-    if (game['status'] == 'setup' and
-        game['auto_start_time'] and
-        current_time >= game['auto_start_time']):
-
-        # Auto-start the game
-        cursor.execute('''
-        UPDATE games
-        SET status = 'active', start_time = ?
-        WHERE id = ?
-        ''', (current_time, game_id))
-        conn.commit()
+    snapshot = {
+        'teams': teams,
+        'bases': bases,
+        'holds': list(holders.values()),
+        'owners': {base_id: team_id for base_id, (team_id, _) in holders.items()},
+        # Game version of the last change to each team and base, for deltas
+        'team_versions': {team['id']: team['updated_version'] for team in teams_data},
+        'base_versions': {base['id']: base['updated_version'] for base in bases_data}
+    }
+
+    if cache:
+        game_snapshot_cache.put(game_id, game['version'], snapshot)
+    return snapshot
+
+# Helper function to build the scoreboard of a game, highest score first
+def build_scoreboard(game, snapshot):
+    # Calculate team scores
+    team_scores = calculate_team_scores(
+        game,
+        {team['id']: team['banked_points'] for team in snapshot['teams']},
+        snapshot['holds']
+    )
 
-        # Refresh game data
-        cursor.execute('''
-        SELECT g.*, h.name as host_name
-        FROM games g
-        JOIN hosts h ON g.host_id = h.id
-        WHERE g.id = ?
-        ''', (game_id,))
-        game = cursor.fetchone()
+    scores = []
 
-    # Check for auto-end
-    if (game['status'] == 'active' and
-        game['start_time'] and
-        game['game_duration_minutes']):
+    for team in snapshot['teams']:
+        scores.append({
+            'id': team['id'],
+            'name': team['name'],
+            'color': team['color'],
+            'playerCount': len(team['players']),
+            'score': team_scores[team['id']],
+        })
 
-        end_time = game['start_time'] + (game['game_duration_minutes'] * 60)
-        if current_time >= end_time:
-            # Auto-end the game
-            cursor.execute('''
-            UPDATE games
-            SET status = 'ended', end_time = ?
-            WHERE id = ?
-            ''', (end_time, game_id))
-            conn.commit()
+    # Sort by score (descending)
+    scores.sort(key=lambda x: x['score'], reverse=True)
 
-            # Clear QR code assignments
-            cursor.execute('''
-            UPDATE bases SET qr_code = NULL WHERE game_id = ?
-            ''', (game_id,))
+    return scores
 
-            cursor.execute('''
-            DELETE FROM team_qr_codes
-            WHERE team_id IN (SELECT id FROM teams WHERE game_id = ?)
-            ''', (game_id,))
+# Helper function to mark a game as changed
+def bump_game_version(cursor, game_id):
+    """Increase the version of a game, in the same transaction as the change itself"""
+    cursor.execute('UPDATE games SET version = version + 1 WHERE id = ?', (game_id,))
 
-            conn.commit()
+# Helper function to find when the scores of a game will next change
+def scores_valid_until(game, holds):
+    """Return the next points-interval boundary of any held base, or None if scores are fixed"""
+    if game['status'] == 'ended':
+        return None
 
-            # Refresh game data
-            cursor.execute('''
-            SELECT g.*, h.name as host_name
-            FROM games g
-            JOIN hosts h ON g.host_id = h.id
-            WHERE g.id = ?
-            ''', (game_id,))
-            game = cursor.fetchone()
+    current_time = int(time.time())
+    points_interval = game['points_interval_seconds']
 
-    conn.close()
+    valid_until = None
+    for _, held_since in holds:
+        boundary = held_since + ((current_time - held_since) // points_interval + 1) * points_interval
+        if valid_until is None or boundary < valid_until:
+            valid_until = boundary
+
+    return valid_until
+
+# Helper function to build the ETag of a game state response
+def game_state_etag(kind, game, holds):
+    """Return (etag, valid_until); the ETag changes with the game version and the scores"""
+    valid_until = scores_valid_until(game, holds)
+    return f"{kind}-{game['version']}-{valid_until or 0}", valid_until
+
+# Helper function to add the versioning headers to a game state response
+def add_game_state_headers(response, etag, game, valid_until):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Game-Version'] = str(game['version'])
+    if valid_until is not None:
+        response.headers['X-Valid-Until'] = str(valid_until)
+    return response
+
+# Seconds browsers and proxies may reuse the final results of an ended game without asking
+FINAL_RESULTS_MAX_AGE = 86400
+
+# Helper function to serialize a response body exactly as jsonify does
+def json_body(data):
+    return app.json.response(data).get_data()
+
+# Helper function to build the final details and scoreboard of an ended game
+def build_game_results(cursor, game_id, cache=True):
+    """Return (game, game JSON, scores JSON), the bodies as get_game and get_scores send them"""
+    cursor.execute('''
+    SELECT g.*, h.name as host_name
+    FROM games g
+    JOIN hosts h ON g.host_id = h.id
+    WHERE g.id = ?
+    ''', (game_id,))
+    game = cursor.fetchone()
 
-    # Calculate end time if duration is set
-    calculated_end_time = None
-    if game['start_time'] and game['game_duration_minutes']:
-        calculated_end_time = game['start_time'] + (game['game_duration_minutes'] * 60)
+    snapshot = load_game_snapshot(cursor, game, cache)
+    return game, json_body(build_game_details(game, snapshot)), json_body(build_scoreboard(game, snapshot))
 
-    return jsonify({
-        'id': game['id'],
-        'name': game['name'],
-        'status': game['status'],
-        'hostName': game['host_name'],
-        'settings': {
-            'capture_radius_meters': game['capture_radius_meters'],
-            'points_interval_seconds': game['points_interval_seconds'],
-            'auto_start_time': game['auto_start_time'],
-            'game_duration_minutes': game['game_duration_minutes'],
-            'calculated_end_time': calculated_end_time
-        },
-        'teams': teams,
-        'bases': bases
-    })
+# Helper function to store the final details and scoreboard of a game that has just ended
+def freeze_game_results(cursor, game_id):
+    """Return (game JSON, scores JSON). Must run in the transaction that ends the game,
+    after its version has been bumped."""
+    # The game has not ended for other readers until the caller commits
+    game, game_json, scores_json = build_game_results(cursor, game_id, cache=False)
 
-# Helper function to calculate team score
-def calculate_team_score(cursor, team_id, game):
-    total_score = 0
+    # Stored compressed; served as is on every later read
+    cursor.execute('''
+    INSERT INTO game_results (game_id, version, frozen_time, game_json, scores_json)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (game_id) DO UPDATE SET
+        version = excluded.version,
+        frozen_time = excluded.frozen_time,
+        game_json = excluded.game_json,
+        scores_json = excluded.scores_json
+    ''', (game_id, game['version'], int(time.time()), zlib.compress(game_json, 9), zlib.compress(scores_json, 9)))
+
+    return game_json, scores_json
+
+# Helper function to check that an ended game's frozen results match its version
+def has_current_results(cursor, game):
+    cursor.execute('SELECT version FROM game_results WHERE game_id = ?', (game['id'],))
+    stored = cursor.fetchone()
+    return stored is not None and stored['version'] == game['version']
+
+# Helper function to get the final results of an ended game
+def load_game_results(cursor, game):
+    """Return (game JSON, scores JSON). Reads never write: results that are missing or
+    out of date are built from the game as it is, and frozen by rebuild-score-ledger."""
+    results = game_results_cache.get(game['id'], game['version'])
+    if results is not None:
+        return results
+
+    cursor.execute('SELECT version, game_json, scores_json FROM game_results WHERE game_id = ?', (game['id'],))
+    stored = cursor.fetchone()
+
+    if stored and stored['version'] == game['version']:
+        results = (zlib.decompress(stored['game_json']), zlib.decompress(stored['scores_json']))
+    else:
+        _, game_json, scores_json = build_game_results(cursor, game['id'])
+        results = (game_json, scores_json)
 
-    # Get all bases for this game
-    cursor.execute('SELECT id FROM bases WHERE game_id = ?', (game['id'],))
-    bases = cursor.fetchall()
+    game_results_cache.put(game['id'], game['version'], results)
+    return results
 
-    # Calculate current time or end time if game is over
-    current_time = game['end_time'] if game['status'] == 'ended' else int(time.time())
+# Helper function to send the final results of an ended game, which never change
+def final_results_response(body, kind, game):
+    etag = f"{kind}-final-{game['version']}"
 
-    # Get the points interval from game settings
-    points_interval = game['points_interval_seconds']
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
 
-    # For each base, calculate points earned by this team
-    for base in bases:
-        base_id = base['id']
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={FINAL_RESULTS_MAX_AGE}'
+    response.headers['X-Game-Version'] = str(game['version'])
+    return response
 
-        # Get all captures for this base in chronological order
-        cursor.execute('''
-        SELECT team_id, capture_time FROM captures
-        WHERE base_id = ?
-        ORDER BY capture_time ASC
-        ''', (base_id,))
-        captures = cursor.fetchall()
-
-        # Calculate points for each period the team owned the base
-        for i, capture in enumerate(captures):
-            # If this is a capture by our team
-            if capture['team_id'] == team_id:
-                start_time = capture['capture_time']
-
-                # Figure out when this team's control ended
-                if i < len(captures) - 1:
-                    end_time = captures[i + 1]['capture_time']
-                else:
-                    end_time = current_time
-
-                # Calculate points using configurable interval
-                duration = end_time - start_time
-                points = duration // points_interval
-                total_score += points
-
-    return total_score
+# Helper function to refuse changes to a game whose results are final
+def ended_game_error(status):
+    """Return an error response if the game has ended, else None"""
+    if status == 'ended':
+        return jsonify({'error': 'Game has ended and can no longer be changed'}), 400
+    return None
 
 # Start game
 @app.route('/api/games/<game_id>/start', methods=['POST'])
@@ -752,23 +2665,24 @@ def start_game(game_id):
     cursor = conn.cursor()
 
     # Verify host is authorized for this game
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
     # Check team count
     cursor.execute('SELECT COUNT(*) FROM teams WHERE game_id = ?', (game_id,))
     team_count = cursor.fetchone()[0]
 
     if team_count < 2:
-        conn.close()
         return jsonify({'error': 'At least 2 teams are required to start the game'}), 400
 
     # Update game status
@@ -778,9 +2692,13 @@ def start_game(game_id):
     SET status = 'active', start_time = ?
     WHERE id = ?
     ''', (current_time, game_id))
+    bump_game_version(cursor, game_id)
 
     conn.commit()
-    conn.close()
+    notify_game_changed(game_id, 'started')
+
+    if game['game_duration_minutes']:
+        lifecycle_scheduler.schedule(game_id, current_time + (game['game_duration_minutes'] * 60))
 
     return jsonify({'success': True})
 
@@ -795,17 +2713,19 @@ def end_game(game_id):
     cursor = conn.cursor()
 
     # Verify host is authorized for this game
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
     # Update game status
     current_time = int(time.time())
     cursor.execute('''
@@ -832,8 +2752,11 @@ def end_game(game_id):
 
     team_count = cursor.rowcount
 
+    bump_game_version(cursor, game_id)
+    freeze_game_results(cursor, game_id)
+
     conn.commit()
-    conn.close()
+    notify_game_changed(game_id, 'ended')
 
     return jsonify({
         'success': True,
@@ -841,6 +2764,46 @@ def end_game(game_id):
         'released_teams': team_count
     })
 
+# List the players of a team, a page at a time, in the order they joined
+@app.route('/api/teams/<team_id>/players', methods=['GET'])
+def get_team_players(team_id):
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+
+    if page < 1 or not (1 <= per_page <= 200):
+        return jsonify({'error': 'Page must be at least 1 and per_page between 1 and 200'}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT id FROM teams WHERE id = ?', (team_id,))
+    if not cursor.fetchone():
+        return jsonify({'error': 'Team not found'}), 404
+
+    cursor.execute('SELECT COUNT(*) FROM players WHERE team_id = ?', (team_id,))
+    total = cursor.fetchone()[0]
+
+    cursor.execute('''
+    SELECT id, name, join_time
+    FROM players
+    WHERE team_id = ?
+    ORDER BY join_time ASC, rowid
+    LIMIT ? OFFSET ?
+    ''', (team_id, per_page, (page - 1) * per_page))
+
+    players = [{
+        'id': player['id'],
+        'name': player['name'],
+        'joinTime': player['join_time']
+    } for player in cursor.fetchall()]
+
+    return jsonify({
+        'players': players,
+        'page': page,
+        'per_page': per_page,
+        'total': total
+    })
+
 # Join team
 @app.route('/api/teams/<team_id>/join', methods=['POST'])
 def join_team(team_id):
@@ -861,9 +2824,12 @@ def join_team(team_id):
     team = cursor.fetchone()
 
     if not team:
-        conn.close()
         return jsonify({'error': 'Team not found'}), 404
 
+    error = ended_game_error(team['status'])
+    if error:
+        return error
+
     # If player_id is provided, check if they're already in a team for this game
     if player_id:
         cursor.execute('''
@@ -877,20 +2843,27 @@ def join_team(team_id):
         if existing_player:
             # Player is already in a team for this game
             if existing_player['team_id'] == team_id:
-                conn.close()
                 return jsonify({'error': 'Player is already a member of this team'}), 400
 
             # Update player to new team (preserving their existing name and ID)
-            cursor.execute('''
-            UPDATE players
-            SET team_id = ?, join_time = ?
-            WHERE id = ?
-            ''', (team_id, current_time, player_id))
+            def move_player(cursor):
+                require_game_status(cursor, team['game_id'], ('setup', 'active'))
+                cursor.execute('''
+                UPDATE players
+                SET team_id = ?, join_time = ?
+                WHERE id = ?
+                ''', (team_id, current_time, player_id))
+                bump_game_version(cursor, team['game_id'])
+
+            try:
+                perform_write(move_player)
+            except WriteQueueFull:
+                return write_queue_full_error()
+            except GameStatusChanged as e:
+                return ended_game_error(e.status)
 
             print(f"Moved player {player_id} ({existing_player['name']}) from team {existing_player['team_id']} to team {team_id}")
-
-            conn.commit()
-            conn.close()
+            notify_game_changed(team['game_id'], 'join', {'team_id': team_id, 'player_id': player_id})
             return jsonify({'player_id': player_id})
 
     # Generate new player ID if not provided (new player joining)
@@ -898,16 +2871,83 @@ def join_team(team_id):
         player_id = str(uuid.uuid4())
 
     # Add player to the new team
-    cursor.execute('''
-    INSERT INTO players (id, team_id, name, join_time)
-    VALUES (?, ?, ?, ?)
-    ''', (player_id, team_id, player_name, current_time))
+    def add_player(cursor):
+        require_game_status(cursor, team['game_id'], ('setup', 'active'))
+        cursor.execute('''
+        INSERT INTO players (id, team_id, name, join_time)
+        VALUES (?, ?, ?, ?)
+        ''', (player_id, team_id, player_name, current_time))
+        bump_game_version(cursor, team['game_id'])
 
-    conn.commit()
-    conn.close()
+    try:
+        perform_write(add_player)
+    except WriteQueueFull:
+        return write_queue_full_error()
+    except GameStatusChanged as e:
+        return ended_game_error(e.status)
+
+    notify_game_changed(team['game_id'], 'join', {'team_id': team_id, 'player_id': player_id})
 
     return jsonify({'player_id': player_id})
 
+# Helper function to check that a player may capture a base from where they stand
+def capture_error(base_data, player, latitude, longitude):
+    """Return (error message, status code) if the capture is not allowed, else None"""
+    if not base_data:
+        return 'Base not found', 404
+
+    error = capture_status_error(base_data['status'])
+    if error:
+        return error
+
+    if not player:
+        return 'Player not found', 404
+
+    if player['game_id'] != base_data['game_id']:
+        return 'Player is not in the game of this base', 403
+
+    return capture_range_error(base_data, latitude, longitude)
+
+# Helper function to check that bases of a game in this status can be captured
+def capture_status_error(status):
+    """Return (error message, status code) unless the game is active, else None"""
+    if status == 'ended':
+        return 'Game has ended and can no longer be changed', 400
+
+    if status != 'active':
+        return 'Game has not started yet', 400
+
+    return None
+
+# Helper function to check that a position is within the capture radius of a base
+def capture_range_error(base_data, latitude, longitude):
+    """Return (error message, status code) if the position is too far away, else None"""
+    # Use configurable capture radius
+    capture_radius = base_data['capture_radius_meters']
+    distance = calculate_distance(latitude, longitude, base_data['latitude'], base_data['longitude'])
+
+    if distance > capture_radius:
+        return f'Player is not within {capture_radius}m of the base location', 403
+
+    return None
+
+# Helper function to record a capture and apply it to the score ledger
+def record_capture(cursor, base_data, team_id, capture_time, idempotency_key=None, client_time=None):
+    """Return False, recording nothing, if the team already holds the base; a rescan
+    would only add a row to the history.
+
+    The ledger can only move forward in time, so capture_time must not be before the
+    current hold of the base. Must run inside a write transaction."""
+    if not record_capture_in_ledger(cursor, base_data['game_id'], base_data['id'], team_id, capture_time,
+                                    base_data['points_interval_seconds']):
+        return False
+
+    cursor.execute('''
+    INSERT INTO captures (id, base_id, team_id, capture_time, idempotency_key, client_time)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (str(uuid.uuid4()), base_data['id'], team_id, capture_time, idempotency_key, client_time))
+    return True
+
 # Capture a base
 @app.route('/api/bases/<base_id>/capture', methods=['POST'])
 def capture_base(base_id):
@@ -916,55 +2956,297 @@ def capture_base(base_id):
         return jsonify({'error': 'Missing required fields'}), 400
 
     player_id = data['player_id']
-    player_lat = data['latitude']
-    player_lng = data['longitude']
+    throttle = app.config['CAPTURE_THROTTLE_ENABLED']
+    now = time.time()
+
+    # Scan spam and in-range rescans of a base the team already holds are answered from memory
+    if throttle:
+        retry_after = capture_throttle.take_token(player_id, now)
+        if retry_after is not None:
+            return capture_throttled_error(retry_after)
+
+        held_base = capture_throttle.held_by_players_team(player_id, base_id, now)
+        if held_base is not None and capture_range_error(held_base, data['latitude'], data['longitude']) is None:
+            return jsonify({'success': True, 'already_held': True})
 
     conn = get_db_connection()
     cursor = conn.cursor()
 
     # Get base location and game settings
-    cursor.execute('''
-    SELECT b.*, g.capture_radius_meters FROM bases b
-    JOIN games g ON b.game_id = g.id
-    WHERE b.id = ?
-    ''', (base_id,))
+    cursor.execute(CAPTURE_BASE_SQL, (base_id,))
     base_data = cursor.fetchone()
 
-    if not base_data:
-        conn.close()
-        return jsonify({'error': 'Base not found'}), 404
-
     # Get player's team
-    cursor.execute('SELECT team_id FROM players WHERE id = ?', (player_id,))
+    cursor.execute(CAPTURE_PLAYER_SQL, (player_id,))
     player = cursor.fetchone()
 
-    if not player:
-        conn.close()
-        return jsonify({'error': 'Player not found'}), 404
+    error = capture_error(base_data, player, data['latitude'], data['longitude'])
+    if error:
+        return jsonify({'error': error[0]}), error[1]
 
     team_id = player['team_id']
+    if throttle:
+        rate, burst = capture_scan_limits(base_data)
+        capture_throttle.admit_player(player_id, team_id, rate, burst, now)
+
+    # Record the capture and update the score ledger in one transaction
+    def write_capture(cursor):
+        require_game_status(cursor, base_data['game_id'], ('active',))
+
+        current_time = int(time.time())
+        if record_capture(cursor, base_data, team_id, current_time):
+            bump_game_version(cursor, base_data['game_id'])
+        else:
+            current_time = None
+
+        # Remembered here rather than after the commit, so a later capture of the
+        # base can't be overwritten by this one
+        if throttle:
+            capture_throttle.remember_holder(base_data, team_id, now)
+        return current_time
 
-    # Use configurable capture radius
-    capture_radius = base_data['capture_radius_meters']
-    distance = calculate_distance(player_lat, player_lng, base_data['latitude'], base_data['longitude'])
+    try:
+        current_time = perform_write(write_capture)
+    except WriteQueueFull:
+        return write_queue_full_error()
+    except GameStatusChanged as e:
+        error = capture_status_error(e.status)
+        return jsonify({'error': error[0]}), error[1]
+    except Exception:
+        # The holder remembered by the write was never committed
+        capture_throttle.forget_holder(base_id)
+        raise
+
+    if current_time is not None:
+        notify_game_changed(base_data['game_id'], 'capture', {'base_id': base_id, 'team_id': team_id, 'capture_time': current_time})
+
+    if current_time is None:
+        return jsonify({'success': True, 'already_held': True})
 
-    if distance > capture_radius:
-        conn.close()
-        return jsonify({'error': f'Player is not within {capture_radius}m of the base location'}), 403
+    return jsonify({'success': True})
 
-    # Record the capture
-    capture_id = str(uuid.uuid4())
-    current_time = int(time.time())
+# Helper function to build the response to a scan refused by the capture throttle
+def capture_throttled_error(retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({'error': f'Scanning too fast, please wait {seconds}s and try again', 'retry_after': seconds})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+# Record a batch of captures made while offline
+@app.route('/api/captures/batch', methods=['POST'])
+def capture_bases_batch():
+    """Each capture carries a client-generated idempotency_key, so a retried sync never
+    records a capture twice, and the client_time it was made at. Responds with a
+    status for every capture, in request order."""
+    data = request.json
+    if not data or not isinstance(data.get('captures'), list):
+        return jsonify({'error': 'A list of captures is required'}), 400
+
+    items = data['captures']
+    max_size = app.config['CAPTURE_BATCH_MAX_SIZE']
+    if len(items) > max_size:
+        return jsonify({'error': f'At most {max_size} captures can be sent at once'}), 400
+
+    required_fields = ('idempotency_key', 'base_id', 'player_id', 'latitude', 'longitude')
+    results = [None] * len(items)
+    valid = []
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or any(item.get(field) is None for field in required_fields):
+            results[index] = {'status': 'rejected', 'error': 'Missing required fields', 'code': 400}
+        elif not all(isinstance(item[field], (int, float)) for field in ('latitude', 'longitude')):
+            results[index] = {'status': 'rejected', 'error': 'Latitude and longitude must be numbers', 'code': 400}
+        else:
+            valid.append((index, item))
+
+    def placeholders(values):
+        return ', '.join('?' * len(values))
+
+    # Validate and record everything in one transaction, so a key checked here can't be recorded meanwhile
+    def write_captures(cursor):
+        current_time = int(time.time())
+
+        base_ids = list({item['base_id'] for _, item in valid})
+        cursor.execute(f'''
+        SELECT b.*, g.capture_radius_meters, g.points_interval_seconds, g.start_time, g.status,
+               g.capture_scans_per_minute, g.capture_scan_burst, h.held_since FROM bases b
+        JOIN games g ON b.game_id = g.id
+        LEFT JOIN base_holders h ON h.base_id = b.id
+        WHERE b.id IN ({placeholders(base_ids)})
+        ''', base_ids)
+        bases = {base['id']: base for base in cursor.fetchall()}
+
+        player_ids = list({item['player_id'] for _, item in valid})
+        cursor.execute(f'''
+        SELECT p.id, p.team_id, p.join_time, t.game_id FROM players p
+        JOIN teams t ON p.team_id = t.id
+        WHERE p.id IN ({placeholders(player_ids)})
+        ''', player_ids)
+        players = {player['id']: player for player in cursor.fetchall()}
+
+        keys = list({str(item['idempotency_key']) for _, item in valid})
+        cursor.execute(CAPTURES_BY_IDEMPOTENCY_KEYS_SQL.format(keys=placeholders(keys)), keys)
+        recorded = {capture['idempotency_key']: capture['capture_time'] for capture in cursor.fetchall()}
+
+        accepted = []
+        for index, item in valid:
+            key = str(item['idempotency_key'])
+
+            # Already recorded by an earlier attempt, or repeated within this batch
+            if key in recorded:
+                results[index] = {'status': 'duplicate', 'capture_time': recorded[key]}
+                continue
+
+            base_data = bases.get(item['base_id'])
+            player = players.get(item['player_id'])
+
+            error = capture_error(base_data, player, item['latitude'], item['longitude'])
+            if error:
+                results[index] = {'status': 'rejected', 'error': error[0], 'code': error[1]}
+                continue
+
+            # Trust the device clock only back to when the player could have made the
+            # capture, and never before a capture of the base that is already recorded
+            client_time = item.get('client_time')
+            capture_time = current_time
+            if isinstance(client_time, (int, float)):
+                earliest = max(base_data['start_time'], player['join_time'],
+                               current_time - app.config['CAPTURE_MAX_OFFLINE_SECONDS'],
+                               base_data['held_since'] or 0)
+                capture_time = min(max(int(client_time), earliest), current_time)
+
+            recorded[key] = capture_time
+            accepted.append((capture_time, index, key, base_data, player, client_time))
+            results[index] = {'status': 'captured', 'capture_time': capture_time}
+
+        # Apply to the ledger in the order the captures were made
+        accepted.sort(key=lambda capture: (capture[0], capture[1]))
+
+        # Each player's scans spend their tokens as if they had been made online
+        if app.config['CAPTURE_THROTTLE_ENABLED']:
+            scans_by_player = {}
+            for capture in accepted:
+                scans_by_player.setdefault(capture[4]['id'], []).append(capture)
+
+            throttled = set()
+            for scans in scans_by_player.values():
+                player, base_data = scans[0][4], scans[0][3]
+                rate, burst = capture_scan_limits(base_data)
+                allowed = capture_throttle.admit_offline_scans(
+                    player['id'], player['team_id'], [scan[0] for scan in scans], rate, burst, current_time)
+                throttled.update(scan[1] for scan, admitted in zip(scans, allowed) if not admitted)
+
+            for capture_time, index, key, base_data, player, client_time in accepted:
+                if index in throttled:
+                    del recorded[key]
+                    results[index] = {'status': 'rejected', 'error': 'Scanning too fast', 'code': 429}
+            accepted = [capture for capture in accepted if capture[1] not in throttled]
+
+        changed_games = {}
+        for capture_time, index, key, base_data, player, client_time in accepted:
+            game_id = base_data['game_id']
+            team_id = player['team_id']
+
+            # A rescan by the holding team changes nothing and records nothing
+            if not record_capture(cursor, base_data, team_id, capture_time, key, client_time):
+                results[index]['already_held'] = True
+                continue
+
+            capture_throttle.forget_holder(base_data['id'])
+            changed_games.setdefault(game_id, []).append({
+                'base_id': base_data['id'],
+                'team_id': team_id,
+                'capture_time': capture_time
+            })
 
-    cursor.execute('''
-    INSERT INTO captures (id, base_id, team_id, capture_time)
-    VALUES (?, ?, ?, ?)
-    ''', (capture_id, base_id, team_id, current_time))
+        for game_id in changed_games:
+            bump_game_version(cursor, game_id)
 
-    conn.commit()
-    conn.close()
+        return changed_games
 
-    return jsonify({'success': True})
+    try:
+        changed_games = perform_write(write_captures)
+    except WriteQueueFull:
+        return write_queue_full_error()
+
+    for game_id, captures in changed_games.items():
+        for capture in captures:
+            notify_game_changed(game_id, 'capture', capture)
+
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and 'idempotency_key' in item:
+            results[index]['idempotency_key'] = item['idempotency_key']
+
+    return jsonify({'results': results})
+
+# Find the bases within capture range of a GPS fix
+@app.route('/api/games/<game_id>/nearest-bases', methods=['GET'])
+def get_nearest_bases(game_id):
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lng', type=float)
+    radius = request.args.get('radius', type=float)
+
+    if latitude is None or longitude is None or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return jsonify({'error': 'Valid lat and lng are required'}), 400
+
+    if radius is not None and not (0 < radius <= 50000):
+        return jsonify({'error': 'Radius must be between 0 and 50000 meters'}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    game = cursor.fetchone()
+
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    # Defaults to the capture radius, so the result is the bases a scan here could capture
+    capture_radius = game['capture_radius_meters']
+    snapshot = load_game_snapshot(cursor, game)
+    nearby = load_base_index(cursor, game, snapshot).within(latitude, longitude, radius or capture_radius)
+
+    return jsonify({
+        'capture_radius_meters': capture_radius,
+        'bases': [{
+            'id': base['id'],
+            'name': base['name'],
+            'lat': base['lat'],
+            'lng': base['lng'],
+            'ownedBy': snapshot['owners'].get(base['id']),
+            'distance_meters': round(distance, 1),
+            'in_capture_range': distance <= capture_radius
+        } for distance, base in nearby]
+    })
+
+# Check a game's base layout for capture circles that overlap
+@app.route('/api/games/<game_id>/layout-check', methods=['GET'])
+def check_base_layout(game_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    game = cursor.fetchone()
+
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    # Bases closer than twice the capture radius share ground where a scan could count for either
+    min_spacing = 2 * game['capture_radius_meters']
+    bases = load_game_snapshot(cursor, game)['bases']
+    pairs = close_pairs([(base['lat'], base['lng']) for base in bases], min_spacing)
+
+    return jsonify({
+        'capture_radius_meters': game['capture_radius_meters'],
+        'min_spacing_meters': min_spacing,
+        'bases_checked': len(bases),
+        'overlapping': [{
+            'base_ids': [bases[i]['id'], bases[j]['id']],
+            'base_names': [bases[i]['name'], bases[j]['name']],
+            'distance_meters': round(distance, 1)
+        } for i, j, distance in pairs]
+    })
 
 # Get current scores
 @app.route('/api/games/<game_id>/scores', methods=['GET'])
@@ -973,41 +3255,112 @@ def get_scores(game_id):
     cursor = conn.cursor()
 
     # Get game info to determine scoring period
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
-    # Get teams
-    cursor.execute('SELECT * FROM teams WHERE game_id = ?', (game_id,))
-    teams_data = cursor.fetchall()
+    if game['status'] == 'ended':
+        _, scores_json = load_game_results(cursor, game)
+        return final_results_response(scores_json, 'scores', game)
 
-    scores = []
+    snapshot = load_game_snapshot(cursor, game)
 
-    for team in teams_data:
-        # Count players
-        cursor.execute('SELECT COUNT(*) FROM players WHERE team_id = ?', (team['id'],))
-        player_count = cursor.fetchone()[0]
+    # Nothing to send if the client already has these scores
+    etag, valid_until = game_state_etag('scores', game, snapshot['holds'])
+    if request.if_none_match.contains_weak(etag):
+        return add_game_state_headers(app.response_class(status=304), etag, game, valid_until)
 
-        # Calculate team score
-        team_score = calculate_team_score(cursor, team['id'], game)
+    scores = build_scoreboard(game, snapshot)
 
-        scores.append({
-            'id': team['id'],
-            'name': team['name'],
-            'color': team['color'],
-            'playerCount': player_count,
-            'score': team_score,
-        })
+    return add_game_state_headers(jsonify(scores), etag, game, valid_until)
 
-    conn.close()
+# Helper function to replay a game's scores at evenly spaced instants
+def build_score_timeline(cursor, game, team_ids, resolution):
+    """Return (sample times, score series by team id) from one pass over the capture log.
 
-    # Sort by score (descending)
-    scores.sort(key=lambda x: x['score'], reverse=True)
+    Holds are banked exactly as the score ledger banks them, so the last sample
+    equals the scores reported by get_scores."""
+    cursor.execute(GAME_CAPTURE_TIMELINE_SQL, (game['id'],))
+    captures = cursor.fetchall()
 
-    return jsonify(scores)
+    start_time = game['start_time']
+    span = max(score_reference_time(game) - start_time, 0)
+    times = [start_time + (span * step) // (resolution - 1) for step in range(resolution)]
+
+    points_interval = game['points_interval_seconds']
+    banked = {}
+    holders = {}  # base id -> (team id, held since)
+    series = {team_id: [] for team_id in team_ids}
+    next_capture = 0
+
+    for sample_time in times:
+        # Apply every capture up to this instant
+        while next_capture < len(captures) and captures[next_capture]['capture_time'] <= sample_time:
+            capture = captures[next_capture]
+            holder = holders.get(capture['base_id'])
+            if holder:
+                team_id, held_since = holder
+                banked[team_id] = banked.get(team_id, 0) + (capture['capture_time'] - held_since) // points_interval
+
+            holders[capture['base_id']] = (capture['team_id'], capture['capture_time'])
+            next_capture += 1
+
+        scores = dict(banked)
+        for team_id, held_since in holders.values():
+            scores[team_id] = scores.get(team_id, 0) + (sample_time - held_since) // points_interval
+
+        for team_id in team_ids:
+            series[team_id].append(scores.get(team_id, 0))
+
+    return times, series
+
+# Get each team's score over the course of a game
+@app.route('/api/games/<game_id>/timeline', methods=['GET'])
+def get_score_timeline(game_id):
+    resolution = request.args.get('resolution', 100, type=int)
+    if not (2 <= resolution <= 1000):
+        return jsonify({'error': 'Resolution must be between 2 and 1000'}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    game = cursor.fetchone()
+
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    if not game['start_time']:
+        return jsonify({'error': 'Game has not started'}), 400
+
+    # The timeline of an ended game never changes
+    cache_key = (game_id, resolution)
+    if game['status'] == 'ended':
+        timeline = score_timeline_cache.get(cache_key, game['version'])
+        if timeline is not None:
+            return jsonify(timeline)
+
+    teams = load_game_snapshot(cursor, game)['teams']
+    team_ids = [team['id'] for team in teams]
+    times, series = build_score_timeline(cursor, game, team_ids, resolution)
+
+    # Columnar: scores[i][j] is the score of team_ids[i] at times[j]
+    timeline = {
+        'status': game['status'],
+        'points_interval_seconds': game['points_interval_seconds'],
+        'times': times,
+        'team_ids': team_ids,
+        'team_names': [team['name'] for team in teams],
+        'team_colors': [team['color'] for team in teams],
+        'scores': [series[team_id] for team_id in team_ids]
+    }
+
+    if game['status'] == 'ended':
+        score_timeline_cache.put(cache_key, game['version'], timeline)
+
+    return jsonify(timeline)
 
 # Add a new base to a game
 @app.route('/api/games/<game_id>/bases', methods=['POST'])
@@ -1020,17 +3373,19 @@ def add_base(game_id):
     cursor = conn.cursor()
 
     # Verify game exists and host is authorized
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
     # Add new base
     base_id = str(uuid.uuid4())
 
@@ -1039,13 +3394,13 @@ def add_base(game_id):
         INSERT INTO bases (id, game_id, name, latitude, longitude, qr_code)
         VALUES (?, ?, ?, ?, ?, ?)
         ''', (base_id, game_id, data['name'], data['latitude'], data['longitude'], data['qr_code']))
+        bump_game_version(cursor, game_id)
 
         conn.commit()
     except sqlite3.IntegrityError:
-        conn.close()
         return jsonify({'error': 'QR code already exists'}), 400
 
-    conn.close()
+    notify_game_changed(game_id, 'base', {'base_id': base_id})
 
     return jsonify({'base_id': base_id}), 201
 
@@ -1060,23 +3415,24 @@ def add_team(game_id):
     cursor = conn.cursor()
 
     # Verify game exists and host is authorized
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
     # Check if QR code is already assigned to a base
     cursor.execute('SELECT id FROM bases WHERE qr_code = ?', (data['qr_code'],))
     existing_base = cursor.fetchone()
 
     if existing_base:
-        conn.close()
         return jsonify({'error': 'QR code already assigned to a base'}), 400
 
     # Check if QR code is already assigned to a team
@@ -1084,7 +3440,6 @@ def add_team(game_id):
     existing_team = cursor.fetchone()
 
     if existing_team:
-        conn.close()
         return jsonify({'error': 'QR code already assigned to a team'}), 400
 
     # Generate a secure UUID for the team ID
@@ -1096,16 +3451,228 @@ def add_team(game_id):
         INSERT INTO teams (id, game_id, name, color, qr_code)
         VALUES (?, ?, ?, ?, ?)
         ''', (team_id, game_id, data['name'], data['color'], data['qr_code']))
+        bump_game_version(cursor, game_id)
 
         conn.commit()
     except sqlite3.IntegrityError:
-        conn.close()
         return jsonify({'error': 'Error creating team'}), 400
 
-    conn.close()
+    notify_game_changed(game_id, 'team', {'team_id': team_id})
 
     return jsonify({'team_id': team_id}), 201
 
+# Helper function to read the rows of an uploaded CSV file
+def parse_csv_rows(text):
+    """Return (line number, row dict with lower-cased headers) for each non-empty row"""
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+    rows = []
+    for row in reader:
+        values = {key: (value or '').strip() for key, value in row.items() if key is not None}
+        if any(values.values()):
+            rows.append((reader.line_num, values))
+    return rows
+
+# Helper function to read bases from a CSV file or a GeoJSON FeatureCollection of points
+def parse_base_import(source):
+    """Return (rows, errors); rows are (row number, name, latitude, longitude, QR code)"""
+    if isinstance(source, str) and source.lstrip().startswith('{'):
+        try:
+            source = json.loads(source)
+        except ValueError:
+            return [], [{'source': 'bases', 'row': None, 'error': 'Invalid GeoJSON'}]
+
+    entries = []
+    if isinstance(source, dict):
+        if source.get('type') != 'FeatureCollection' or not isinstance(source.get('features'), list):
+            return [], [{'source': 'bases', 'row': None, 'error': 'Expected a GeoJSON FeatureCollection'}]
+
+        # Rows of a FeatureCollection are numbered by feature, from 1
+        for number, feature in enumerate(source['features'], start=1):
+            feature = feature if isinstance(feature, dict) else {}
+            geometry = feature.get('geometry') or {}
+            properties = feature.get('properties') or {}
+            coordinates = geometry.get('coordinates') if geometry.get('type') == 'Point' else None
+
+            if not isinstance(coordinates, list) or len(coordinates) < 2:
+                entries.append((number, None, 'Feature must be a Point'))
+                continue
+
+            # GeoJSON positions are longitude first
+            entries.append((number, {
+                'name': properties.get('name'),
+                'latitude': coordinates[1],
+                'longitude': coordinates[0],
+                'qr_code': properties.get('qr_code')
+            }, None))
+    elif not isinstance(source, str):
+        return [], [{'source': 'bases', 'row': None, 'error': 'Expected CSV text or a GeoJSON FeatureCollection'}]
+    else:
+        # Rows of a CSV file are numbered by line, the header being line 1
+        for number, row in parse_csv_rows(source):
+            entries.append((number, {
+                'name': row.get('name'),
+                'latitude': row.get('latitude', row.get('lat')),
+                'longitude': row.get('longitude', row.get('lng', row.get('lon'))),
+                'qr_code': row.get('qr_code')
+            }, None))
+
+    rows = []
+    errors = []
+    for number, base, error in entries:
+        if error is None and not (base['name'] and base['qr_code']):
+            error = 'Name and QR code are required'
+
+        if error is None:
+            try:
+                latitude = float(base['latitude'])
+                longitude = float(base['longitude'])
+            except (TypeError, ValueError):
+                latitude = longitude = None
+
+            if latitude is None or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                error = 'Latitude and longitude must be valid coordinates'
+
+        if error is not None:
+            errors.append({'source': 'bases', 'row': number, 'error': error})
+        else:
+            rows.append((number, str(base['name']), latitude, longitude, str(base['qr_code'])))
+
+    return rows, errors
+
+# Helper function to read teams from a CSV file
+def parse_team_import(source):
+    """Return (rows, errors); rows are (row number, name, color, QR code)"""
+    if not isinstance(source, str):
+        return [], [{'source': 'teams', 'row': None, 'error': 'Expected CSV text'}]
+
+    rows = []
+    errors = []
+    for number, row in parse_csv_rows(source):
+        if not (row.get('name') and row.get('color') and row.get('qr_code')):
+            errors.append({'source': 'teams', 'row': number, 'error': 'Name, color and QR code are required'})
+        else:
+            rows.append((number, row['name'], row['color'], row['qr_code']))
+
+    return rows, errors
+
+# Helper function to find which of a set of QR codes are already assigned
+def find_assigned_qr_codes(cursor, qr_codes):
+    """Return {QR code: 'base', 'team' or 'host'} for codes already in use"""
+    qr_codes = list(qr_codes)
+    assigned = {}
+
+    # Stay well inside SQLite's limit on bound parameters
+    for start in range(0, len(qr_codes), 300):
+        chunk = qr_codes[start:start + 300]
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f'''
+        SELECT qr_code, 'base' FROM bases WHERE qr_code IN ({placeholders})
+        UNION ALL
+        SELECT qr_code, 'team' FROM teams WHERE qr_code IN ({placeholders})
+        UNION ALL
+        SELECT qr_code, 'host' FROM hosts WHERE qr_code IN ({placeholders})
+        ''', chunk * 3)
+        assigned.update((row[0], row[1]) for row in cursor.fetchall())
+
+    return assigned
+
+# Import bases and teams into a game from uploaded files
+@app.route('/api/games/<game_id>/import', methods=['POST'])
+def import_game_setup(game_id):
+    """Accepts a multipart upload (host_id field, bases and teams files) or JSON with the same
+    keys. Bases are a CSV file (name, latitude, longitude, qr_code) or a GeoJSON FeatureCollection
+    of points with name and qr_code properties; teams are a CSV file (name, color, qr_code).
+
+    Nothing is imported unless every row is valid; otherwise every invalid row is reported."""
+    if request.files or request.form:
+        host_id = request.form.get('host_id')
+        bases_source = request.files['bases'].read().decode('utf-8-sig') if 'bases' in request.files else None
+        teams_source = request.files['teams'].read().decode('utf-8-sig') if 'teams' in request.files else None
+    else:
+        data = request.get_json(silent=True) or {}
+        host_id = data.get('host_id')
+        bases_source = data.get('bases')
+        teams_source = data.get('teams')
+
+    if not host_id:
+        return jsonify({'error': 'Host ID required'}), 400
+
+    if bases_source is None and teams_source is None:
+        return jsonify({'error': 'Nothing to import: provide bases and/or teams'}), 400
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Verify game exists and host is authorized
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    game = cursor.fetchone()
+
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    if game['host_id'] != host_id:
+        return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
+
+    error = ended_game_error(game['status'])
+    if error:
+        return error
+
+    bases, errors = parse_base_import(bases_source) if bases_source is not None else ([], [])
+    teams, team_errors = parse_team_import(teams_source) if teams_source is not None else ([], [])
+    errors.extend(team_errors)
+
+    max_rows = app.config['IMPORT_MAX_ROWS']
+    if len(bases) + len(teams) > max_rows:
+        return jsonify({'error': f'At most {max_rows} bases and teams can be imported at once'}), 400
+
+    # Check QR codes against each other, then against everything already assigned, in one pass
+    uploaded = [('bases', number, qr_code) for number, _, _, _, qr_code in bases]
+    uploaded += [('teams', number, qr_code) for number, _, _, qr_code in teams]
+
+    cursor.execute('BEGIN IMMEDIATE')
+    assigned = find_assigned_qr_codes(cursor, {qr_code for _, _, qr_code in uploaded})
+
+    seen = set()
+    for source, number, qr_code in uploaded:
+        if qr_code in seen:
+            errors.append({'source': source, 'row': number, 'error': f'QR code {qr_code} appears more than once'})
+        elif qr_code in assigned:
+            errors.append({'source': source, 'row': number, 'error': f'QR code {qr_code} already assigned to a {assigned[qr_code]}'})
+        seen.add(qr_code)
+
+    if errors:
+        conn.rollback()
+        errors.sort(key=lambda error: (error['source'], error['row'] or 0))
+        return jsonify({'error': 'Import failed, nothing was imported', 'errors': errors}), 400
+
+    base_ids = [str(uuid.uuid4()) for _ in bases]
+    team_ids = [str(uuid.uuid4()) for _ in teams]
+
+    cursor.executemany('''
+    INSERT INTO bases (id, game_id, name, latitude, longitude, qr_code)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(base_id, game_id, name, latitude, longitude, qr_code)
+          for base_id, (_, name, latitude, longitude, qr_code) in zip(base_ids, bases)])
+
+    cursor.executemany('''
+    INSERT INTO teams (id, game_id, name, color, qr_code)
+    VALUES (?, ?, ?, ?, ?)
+    ''', [(team_id, game_id, name, color, qr_code)
+          for team_id, (_, name, color, qr_code) in zip(team_ids, teams)])
+
+    bump_game_version(cursor, game_id)
+    conn.commit()
+
+    if base_ids:
+        notify_game_changed(game_id, 'base', {'base_ids': base_ids})
+    if team_ids:
+        notify_game_changed(game_id, 'team', {'team_ids': team_ids})
+
+    return jsonify({'base_ids': base_ids, 'team_ids': team_ids}), 201
+
 # Get QR code assignment status
 @app.route('/api/qr-codes/<qr_code>/status', methods=['GET'])
 def check_qr_code_status(qr_code):
@@ -1113,11 +3680,10 @@ def check_qr_code_status(qr_code):
     cursor = conn.cursor()
 
     # Check if QR code is assigned to a team
-    cursor.execute('SELECT id, game_id FROM teams WHERE qr_code = ?', (qr_code,))
+    cursor.execute(TEAM_BY_QR_CODE_SQL, (qr_code,))
     team = cursor.fetchone()
 
     if team:
-        conn.close()
         return jsonify({
             'status': 'team',
             'team_id': team['id'],
@@ -1125,11 +3691,10 @@ def check_qr_code_status(qr_code):
         })
 
     # Check if QR code is assigned to a base
-    cursor.execute('SELECT id, game_id FROM bases WHERE qr_code = ?', (qr_code,))
+    cursor.execute(BASE_BY_QR_CODE_SQL, (qr_code,))
     base = cursor.fetchone()
 
     if base:
-        conn.close()
         return jsonify({
             'status': 'base',
             'base_id': base['id'],
@@ -1137,7 +3702,7 @@ def check_qr_code_status(qr_code):
         })
 
     # Check if QR code is assigned to a host
-    cursor.execute('SELECT id, name, expiry_date FROM hosts WHERE qr_code = ?', (qr_code,))
+    cursor.execute(HOST_BY_QR_CODE_SQL, (qr_code,))
     host = cursor.fetchone()
 
     if host:
@@ -1146,7 +3711,6 @@ def check_qr_code_status(qr_code):
         if host['expiry_date'] and host['expiry_date'] < int(time.time()):
             expired = True
 
-        conn.close()
         return jsonify({
             'status': 'host',
             'host_id': host['id'],
@@ -1155,32 +3719,8 @@ def check_qr_code_status(qr_code):
         })
 
     # If not assigned
-    conn.close()
     return jsonify({'status': 'unassigned'})
 
-# Calculate distance between two GPS points in meters
-def calculate_distance(lat1, lon1, lat2, lon2):
-    # Haversine formula for calculating distance between GPS coordinates
-    R = 6371  # Earth radius in kilometers
-
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-
-    # Differences
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-
-    # Haversine formula
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-
-    # Convert to meters
-    return distance * 1000
-
 # Update team name and color
 @app.route('/api/teams/<team_id>', methods=['PUT'])
 def update_team(team_id):
@@ -1193,7 +3733,7 @@ def update_team(team_id):
 
     # Get team and game info
     cursor.execute('''
-    SELECT t.*, g.host_id FROM teams t
+    SELECT t.*, g.host_id, g.status FROM teams t
     JOIN games g ON t.game_id = g.id
     WHERE t.id = ?
     ''', (team_id,))
@@ -1201,13 +3741,15 @@ def update_team(team_id):
     team = cursor.fetchone()
 
     if not team:
-        conn.close()
         return jsonify({'error': 'Team not found'}), 404
 
     if team['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
+    error = ended_game_error(team['status'])
+    if error:
+        return error
+
     # Update team details
     update_fields = []
     params = []
@@ -1221,7 +3763,6 @@ def update_team(team_id):
         params.append(data['color'])
 
     if not update_fields:
-        conn.close()
         return jsonify({'error': 'No fields to update'}), 400
 
     params.append(team_id)
@@ -1230,9 +3771,10 @@ def update_team(team_id):
         f"UPDATE teams SET {', '.join(update_fields)} WHERE id = ?",
         params
     )
+    bump_game_version(cursor, team['game_id'])
 
     conn.commit()
-    conn.close()
+    notify_game_changed(team['game_id'], 'team', {'team_id': team_id})
 
     return jsonify({'success': True})
 
@@ -1247,15 +3789,13 @@ def delete_game(game_id):
     cursor = conn.cursor()
 
     # Verify game exists and host is authorized
-    cursor.execute('SELECT * FROM games WHERE id = ?', (game_id,))
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
     game = cursor.fetchone()
 
     if not game:
-        conn.close()
         return jsonify({'error': 'Game not found'}), 404
 
     if game['host_id'] != data['host_id']:
-        conn.close()
         return jsonify({'error': 'Unauthorized: host ID does not match game owner'}), 403
 
     try:
@@ -1270,7 +3810,7 @@ def delete_game(game_id):
         cursor.execute('SELECT COUNT(*) FROM captures WHERE base_id IN (SELECT id FROM bases WHERE game_id = ?)', (game_id,))
         captures_count = cursor.fetchone()[0]
 
-        cursor.execute('SELECT COUNT(*) FROM players WHERE team_id IN (SELECT id FROM teams WHERE game_id = ?)', (game_id,))
+        cursor.execute(GAME_PLAYER_COUNT_SQL, (game_id,))
         players_count = cursor.fetchone()[0]
 
         cursor.execute('SELECT COUNT(*) FROM bases WHERE game_id = ?', (game_id,))
@@ -1279,6 +3819,11 @@ def delete_game(game_id):
         cursor.execute('SELECT COUNT(*) FROM teams WHERE game_id = ?', (game_id,))
         teams_count = cursor.fetchone()[0]
 
+        # Delete the final results and score ledger (references bases and teams)
+        cursor.execute('DELETE FROM game_results WHERE game_id = ?', (game_id,))
+        cursor.execute('DELETE FROM team_scores WHERE game_id = ?', (game_id,))
+        cursor.execute('DELETE FROM base_holders WHERE game_id = ?', (game_id,))
+
         # Delete captures (must be deleted before bases and teams due to foreign keys)
         cursor.execute('DELETE FROM captures WHERE base_id IN (SELECT id FROM bases WHERE game_id = ?)', (game_id,))
 
@@ -1300,10 +3845,9 @@ def delete_game(game_id):
     except sqlite3.Error as e:
         # Rollback on error
         cursor.execute('ROLLBACK')
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
-    conn.close()
+    notify_game_changed(game_id, 'deleted')
 
     return jsonify({
         'success': True,
@@ -1327,11 +3871,8 @@ def get_host_qr_code(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
-    conn.close()
-
     base_url = request.host_url.rstrip('/')
     qr_url = f"{base_url}/?id={host['qr_code']}"
 
@@ -1351,45 +3892,26 @@ def get_host_games(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     # Check if host has expired
     if host['expiry_date'] and host['expiry_date'] < int(time.time()):
-        conn.close()
         return jsonify({'error': 'Host account has expired'}), 403
 
-    # Get all games for this host
-    cursor.execute('''
-    SELECT id, name, status, start_time, end_time
-    FROM games
-    WHERE host_id = ?
-    ORDER BY
-        CASE
-            WHEN status = 'active' THEN 1
-            WHEN status = 'setup' THEN 2
-            ELSE 3
-        END,
-        COALESCE(start_time, 0) DESC
-    ''', (host_id,))
+    # Get all games for this host with their team counts
+    cursor.execute(HOST_GAMES_SQL, (host_id,))
 
     games = []
     for game in cursor.fetchall():
-        # Get team count for each game
-        cursor.execute('SELECT COUNT(*) FROM teams WHERE game_id = ?', (game['id'],))
-        team_count = cursor.fetchone()[0]
-
         games.append({
             'id': game['id'],
             'name': game['name'],
             'status': game['status'],
             'start_time': game['start_time'],
             'end_time': game['end_time'],
-            'team_count': team_count
+            'team_count': game['team_count']
         })
 
-    conn.close()
-
     return jsonify(games)
 
 # Get host details
@@ -1402,7 +3924,6 @@ def get_host(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     # Count games for this host
@@ -1414,8 +3935,6 @@ def get_host(host_id):
     if host['expiry_date'] and host['expiry_date'] < int(time.time()):
         expired = True
 
-    conn.close()
-
     return jsonify({
         'id': host['id'],
         'name': host['name'],
@@ -1438,7 +3957,6 @@ def regenerate_host_qr(host_id):
     host = cursor.fetchone()
 
     if not host:
-        conn.close()
         return jsonify({'error': 'Host not found'}), 404
 
     # Generate new QR code
@@ -1451,20 +3969,529 @@ def regenerate_host_qr(host_id):
 
         conn.commit()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
-    conn.close()
-
     return jsonify({
         'id': host_id,
         'qr_code': new_qr
     })
 
+# ==========================================================
+# Live Game Events (Server-Sent Events)
+# ==========================================================
+
+# Seconds between keep-alive comments on an idle event stream
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+
+# Events a subscriber may fall behind by before it is disconnected
+EVENT_STREAM_MAX_PENDING = 100
+
+# A client subscribed to the events of one game
+class GameEventSubscriber:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=EVENT_STREAM_MAX_PENDING)
+        self.closed = False
+
+    def send(self, message):
+        """Queue an encoded event, closing the subscriber if it has fallen too far behind"""
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.closed = True
+
+    def receive(self, timeout):
+        """Return the next encoded event, or None if nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+# In-process fan-out of game events to every subscriber of that game
+class GameEventBroker:
+    """Encodes each event once and hands the same bytes to every subscriber.
+
+    A background thread also publishes a 'scores' event for each subscribed
+    game whenever its scores change, i.e. at the next points-interval
+    boundary of a held base, and sends each new subscriber the current
+    scores on its own."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.subscribers = {}  # game id -> set of GameEventSubscriber
+        self.next_score_tick = {}  # game id -> time of the next 'scores' event, None if fixed
+        self.new_subscribers = {}  # game id -> subscribers still waiting for their first 'scores' event
+        self.ticker = None
+
+    def subscribe(self, game_id, subscriber):
+        with self.condition:
+            self.subscribers.setdefault(game_id, set()).add(subscriber)
+
+            # Send the new subscriber current scores straight away; the others already have them
+            self.new_subscribers.setdefault(game_id, []).append(subscriber)
+            if self.ticker is None:
+                self.ticker = threading.Thread(target=self.run_score_ticker, name='score-ticker', daemon=True)
+                self.ticker.start()
+            self.condition.notify()
+
+    def unsubscribe(self, game_id, subscriber):
+        with self.condition:
+            subscribers = self.subscribers.get(game_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[game_id]
+                    self.next_score_tick.pop(game_id, None)
+
+    def publish(self, game_id, event, data, refresh_scores=True):
+        with self.condition:
+            subscribers = list(self.subscribers.get(game_id, ()))
+
+            # The change may have moved the next score boundary, so recompute it now
+            if refresh_scores and subscribers:
+                self.next_score_tick[game_id] = 0
+                self.condition.notify()
+
+        self.send(game_id, subscribers, event, data)
+
+    def send(self, game_id, subscribers, event, data):
+        message = f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+        for subscriber in subscribers:
+            subscriber.send(message)
+            if subscriber.closed:
+                self.unsubscribe(game_id, subscriber)
+
+    def run_score_ticker(self):
+        while True:
+            with self.condition:
+                current_time = time.time()
+                ticks = [tick for tick in self.next_score_tick.values() if tick is not None]
+                due = [game_id for game_id, tick in self.next_score_tick.items()
+                       if tick is not None and tick <= current_time]
+
+                if not due and not self.new_subscribers:
+                    timeout = min(ticks) - current_time if ticks else None
+                    self.condition.wait(timeout)
+                    continue
+
+                # Pending until recomputed, so the tick is not published twice
+                for game_id in due:
+                    self.next_score_tick[game_id] = None
+
+                welcome = self.new_subscribers
+                self.new_subscribers = {}
+
+            # New subscribers of a game that is due get its scores with everyone else
+            jobs = [(game_id, None) for game_id in due]
+            jobs += [(game_id, subscribers) for game_id, subscribers in welcome.items() if game_id not in due]
+
+            for game_id, subscribers in jobs:
+                try:
+                    with app.app_context():
+                        self.publish_scores(game_id, subscribers)
+                except Exception as e:
+                    print(f"Failed to publish scores for game {game_id}: {e}")
+
+    def publish_scores(self, game_id, subscribers=None):
+        """Send the game's current scores to every subscriber, or only to subscribers"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(GAME_BY_ID_SQL, (game_id,))
+        game = cursor.fetchone()
+
+        if not game:
+            return
+
+        snapshot = load_game_snapshot(cursor, game)
+
+        scores = build_scoreboard(game, snapshot)
+        valid_until = scores_valid_until(game, snapshot['holds'])
+
+        data = {
+            'version': game['version'],
+            'status': game['status'],
+            'scores': scores,
+            'valid_until': valid_until
+        }
+
+        if subscribers is None:
+            self.publish(game_id, 'scores', data, refresh_scores=False)
+        else:
+            self.send(game_id, subscribers, 'scores', data)
+
+        with self.condition:
+            if game_id not in self.subscribers:
+                return
+
+            if subscribers is None and self.next_score_tick.get(game_id) is None:
+                self.next_score_tick[game_id] = valid_until
+            elif game_id not in self.next_score_tick:
+                # The first subscriber of a game also starts its ticks
+                self.next_score_tick[game_id] = valid_until
+
+game_event_broker = GameEventBroker()
+
+# Helper function to call after committing any change to a game
+def notify_game_changed(game_id, event, data=None):
+    """Drop the cached snapshot of the game and tell live subscribers what happened"""
+    game_snapshot_cache.invalidate(game_id)
+    game_results_cache.invalidate(game_id)
+
+    # The base index is keyed on the base layout; drop it only when the bases may have changed
+    if event in ('base', 'deleted'):
+        base_index_cache.invalidate(game_id)
+
+    # Captures update the holder cache inside their write transaction, in commit order.
+    # Team moves change who holds what; anything else may change whether captures are allowed
+    if event == 'join':
+        capture_throttle.forget_player(data['player_id'])
+    elif event != 'capture':
+        capture_throttle.forget_game(game_id)
+
+    game_event_broker.publish(game_id, event, data or {})
+
+# Stream live events for a game
+@app.route('/api/games/<game_id>/events', methods=['GET'])
+def game_events(game_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT id FROM games WHERE id = ?', (game_id,))
+    game = cursor.fetchone()
+
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+
+    subscriber = GameEventSubscriber()
+    game_event_broker.subscribe(game_id, subscriber)
+
+    def stream():
+        try:
+            # Ask the browser to reconnect quickly if the stream drops
+            yield b'retry: 5000\n\n'
+
+            while not subscriber.closed:
+                message = subscriber.receive(EVENT_STREAM_HEARTBEAT_SECONDS)
+                yield message if message is not None else b': keep-alive\n\n'
+        finally:
+            game_event_broker.unsubscribe(game_id, subscriber)
+
+    return app.response_class(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
+
+# ==========================================================
+# Game Lifecycle Scheduler
+# ==========================================================
+
+# Helper function to find when a game is next due to auto-start or auto-end
+def game_lifecycle_deadline(game):
+    """Return the time of the next automatic transition of the game, or None"""
+    if game['status'] == 'setup' and game['auto_start_time']:
+        return game['auto_start_time']
+
+    if game['status'] == 'active' and game['start_time'] and game['game_duration_minutes']:
+        return game['start_time'] + (game['game_duration_minutes'] * 60)
+
+    return None
+
+# Helper function to auto-start or auto-end a game whose deadline has passed
+def apply_lifecycle_transitions(game_id):
+    """Return the next deadline of the game, or None.
+
+    Each transition is a conditional UPDATE that only matches while the game
+    is still due, so it fires exactly once however many schedulers race for it."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    current_time = int(time.time())
+    events = []
+
+    cursor.execute('''
+    UPDATE games
+    SET status = 'active', start_time = ?
+    WHERE id = ? AND status = 'setup' AND auto_start_time IS NOT NULL AND auto_start_time <= ?
+    ''', (current_time, game_id, current_time))
+
+    if cursor.rowcount:
+        events.append('started')
+
+    # Captures keep landing until the game is ended, so the game ends no earlier than
+    # the latest hold began; a hold can't be measured to a time before it started
+    cursor.execute('''
+    UPDATE games
+    SET status = 'ended', end_time = MAX(
+        start_time + game_duration_minutes * 60,
+        COALESCE((SELECT MAX(held_since) FROM base_holders WHERE game_id = games.id), 0)
+    )
+    WHERE id = ? AND status = 'active' AND start_time IS NOT NULL AND game_duration_minutes IS NOT NULL
+        AND start_time + game_duration_minutes * 60 <= ?
+    ''', (game_id, current_time))
+
+    if cursor.rowcount:
+        events.append('ended')
+
+        # Clear QR code assignments so they can be reused in other games
+        cursor.execute('UPDATE bases SET qr_code = NULL WHERE game_id = ?', (game_id,))
+        cursor.execute('UPDATE teams SET qr_code = NULL WHERE game_id = ?', (game_id,))
+
+    if events:
+        bump_game_version(cursor, game_id)
+
+    if 'ended' in events:
+        freeze_game_results(cursor, game_id)
+
+    conn.commit()
+
+    for event in events:
+        notify_game_changed(game_id, event)
+
+    cursor.execute(GAME_BY_ID_SQL, (game_id,))
+    game = cursor.fetchone()
+
+    return game_lifecycle_deadline(game) if game else None
+
+# Fires the auto-start and auto-end of games at their deadlines
+class GameLifecycleScheduler:
+    """Keeps a min-heap of (deadline, game id) and transitions each game when its deadline passes.
+
+    An entry left behind when a game is rescheduled is harmless: the transition
+    is not due yet, so firing it only schedules the game's real deadline."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.condition = threading.Condition()
+        self.deadlines = []  # heap of (deadline, game id)
+        self.scheduled = set()  # entries in the heap, so a deadline is never queued twice
+        self.thread = None
+
+    def schedule(self, game_id, deadline):
+        if not self.enabled or deadline is None:
+            return
+
+        with self.condition:
+            if (deadline, game_id) in self.scheduled:
+                return
+
+            self.scheduled.add((deadline, game_id))
+            heapq.heappush(self.deadlines, (deadline, game_id))
+            self.condition.notify()
+
+    def schedule_game(self, game):
+        self.schedule(game['id'], game_lifecycle_deadline(game))
+
+    def load_pending(self, cursor):
+        """Schedule every game waiting to auto-start or auto-end"""
+        cursor.execute('''
+        SELECT * FROM games
+        WHERE (status = 'setup' AND auto_start_time IS NOT NULL)
+           OR (status = 'active' AND game_duration_minutes IS NOT NULL)
+        ''')
+        for game in cursor.fetchall():
+            self.schedule_game(game)
+
+    def start(self):
+        with self.condition:
+            if self.enabled and self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='lifecycle-scheduler', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                current_time = time.time()
+                if not self.deadlines or self.deadlines[0][0] > current_time:
+                    timeout = self.deadlines[0][0] - current_time if self.deadlines else None
+                    self.condition.wait(timeout)
+                    continue
+
+                entry = heapq.heappop(self.deadlines)
+                self.scheduled.discard(entry)
+
+            game_id = entry[1]
+            try:
+                with app.app_context():
+                    self.schedule(game_id, apply_lifecycle_transitions(game_id))
+            except Exception as e:
+                print(f"Failed to apply lifecycle transitions for game {game_id}: {e}")
+
+                # Try again shortly rather than leaving the game stuck
+                self.schedule(game_id, int(time.time()) + 5)
+
+lifecycle_scheduler = GameLifecycleScheduler(enabled=app.config['LIFECYCLE_SCHEDULER_ENABLED'])
+
+# Helper function to load pending deadlines and start the scheduler thread
+def start_lifecycle_scheduler():
+    if not lifecycle_scheduler.enabled:
+        return
+
+    conn = open_db_connection()
+    lifecycle_scheduler.load_pending(conn.cursor())
+    conn.close()
+
+    lifecycle_scheduler.start()
+
+# The scheduler starts with the first request rather than at import, so CLI commands
+# don't auto-start and auto-end games; run-scheduler starts it by itself
+@app.before_request
+def start_lifecycle_scheduler_on_first_request():
+    if lifecycle_scheduler.enabled and lifecycle_scheduler.thread is None:
+        start_lifecycle_scheduler()
+
+# Run auto-start and auto-end as a standalone worker: flask --app flask_app run-scheduler
+@app.cli.command('run-scheduler')
+def run_scheduler_command():
+    """Auto-start and auto-end games at their deadlines until interrupted."""
+    lifecycle_scheduler.enabled = True
+    start_lifecycle_scheduler()
+
+    click.echo(f'Scheduler running with {len(lifecycle_scheduler.deadlines)} pending deadline(s)')
+
+    # Games created or changed by the web processes are picked up by reloading periodically
+    while True:
+        lifecycle_scheduler.thread.join(60)
+        start_lifecycle_scheduler()
+
+# ==========================================================
+# Static Assets
+# ==========================================================
+
+# static/ is read once at startup into an in-memory manifest, so serving a
+# file never touches the filesystem. Every file except the entry points also
+# gets a content-hashed URL such as /core.1a2b3c4d5e6f7a8b.js, served as
+# immutable, and quoted references to it in the pages, scripts and styles are
+# rewritten to that URL. A changed file therefore gets a new URL, and so does
+# every file that references it. Text files are compressed once, at the
+# highest levels, and served precompressed to clients that accept it.
+
+# Files that must keep their own URL: pages, the PWA manifest and the service worker
+STATIC_ENTRY_POINTS = ('index.html', 'code-generator/index.html', 'manifest.json', 'service-worker.js')
+
+# Files whose references to other static files are rewritten to hashed URLs
+STATIC_REWRITTEN_EXTENSIONS = ('.html', '.js', '.css', '.json')
+
+STATIC_COMPRESSED_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg')
+
+# A year, the longest browsers honour
+STATIC_IMMUTABLE_MAX_AGE = 31536000
+
+# A file of the manifest, served from memory
+class StaticAsset:
+    __slots__ = ('body', 'mimetype', 'etag', 'encoded', 'immutable')
+
+    def __init__(self, body, mimetype, immutable):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.encoded = {}  # encoding -> compressed body, only where it is smaller
+        self.immutable = immutable
+
+    def compress(self):
+        candidates = {'gzip': gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            candidates['br'] = brotli.compress(self.body, quality=11)
+        self.encoded = {encoding: body for encoding, body in candidates.items() if len(body) < len(self.body)}
+
+# Helper function to insert a content hash into a file name
+def hashed_static_path(path, digest):
+    root, extension = os.path.splitext(path)
+    return f'{root}.{digest}{extension}'
+
+def build_static_manifest(folder):
+    """Return {URL path: StaticAsset}, with hashed files under both their own and their hashed path"""
+    files = {}
+    for directory, _, names in os.walk(folder):
+        for name in names:
+            full_path = os.path.join(directory, name)
+            with open(full_path, 'rb') as static_file:
+                files[os.path.relpath(full_path, folder).replace(os.sep, '/')] = static_file.read()
+
+    hashable = sorted((path for path in files if path not in STATIC_ENTRY_POINTS), key=len, reverse=True)
+    reference = re.compile(r'(?<=["\'])(/?)(' + '|'.join(re.escape(path) for path in hashable) + r')(?=["\'])')
+
+    hashed_paths = {}
+    bodies = {}
+
+    def resolve(path):
+        """Rewrite a file's references, depth first, and return its final body"""
+        if path in bodies:
+            return bodies[path]
+        bodies[path] = files[path]  # A reference cycle ends here, unrewritten
+
+        body = files[path]
+        if path.endswith(STATIC_REWRITTEN_EXTENSIONS) and hashable:
+            # Relative references only resolve from the top folder, where the pages are
+            top_level = '/' not in path
+
+            def rewrite(match):
+                slash, target = match.groups()
+                if not slash and not top_level:
+                    return match.group(0)
+                resolve(target)
+                if target not in hashed_paths:
+                    return match.group(0)
+                return slash + hashed_paths[target]
+
+            body = reference.sub(rewrite, body.decode('utf-8')).encode('utf-8')
+
+        bodies[path] = body
+        if path in hashable:
+            hashed_paths[path] = hashed_static_path(path, hashlib.blake2b(body, digest_size=8).hexdigest())
+        return body
+
+    manifest = {}
+    for path in files:
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        asset = StaticAsset(resolve(path), mimetype, immutable=False)
+        if path.endswith(STATIC_COMPRESSED_EXTENSIONS):
+            asset.compress()
+
+        manifest[path] = asset
+        if path in hashed_paths:
+            immutable_asset = StaticAsset(asset.body, mimetype, immutable=True)
+            immutable_asset.encoded = asset.encoded
+            manifest[hashed_paths[path]] = immutable_asset
+
+        # Folders are served their index page
+        if path.endswith('/index.html'):
+            manifest[path[:-len('index.html')]] = asset
+
+    return manifest
+
+# Helper function to send a static asset in the encoding the client prefers
+def static_asset_response(asset):
+    encoding = request.accept_encodings.best_match(tuple(asset.encoded)) if asset.encoded else None
+    etag = f'{asset.etag}-{encoding}' if encoding else asset.etag
+
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(asset.encoded[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(etag)
+    if asset.encoded:
+        response.vary.add('Accept-Encoding')
+
+    # Hashed URLs never change content; everything else is revalidated with its ETag
+    if asset.immutable:
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+static_manifest = build_static_manifest(app.static_folder) if app.config['STATIC_MANIFEST_ENABLED'] else None
+
 # Serve static files
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
+    if static_manifest is not None:
+        # Anything that isn't a file is a page of the app
+        return static_asset_response(static_manifest.get(path) or static_manifest['index.html'])
+
     if path != "" and os.path.exists(app.static_folder + '/' + path):
         return send_from_directory(app.static_folder, path)
     else:
@@ -0,0 +1,118 @@
+# ==========================================================
+# Geodesic Distances
+# ==========================================================
+
+# Haversine distances between GPS points, one at a time or in bulk.
+# calculate_distance is the reference implementation; the bulk functions use
+# NumPy when it is installed and fall back to calling it in a loop otherwise.
+
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+EARTH_RADIUS_METERS = 6371000
+
+# Pairwise distances are computed this many rows at a time, so memory stays
+# proportional to the number of points rather than its square
+PAIRWISE_BLOCK_ROWS = 512
+
+# Calculate distance between two GPS points in meters
+def calculate_distance(lat1, lon1, lat2, lon2):
+    # Haversine formula for calculating distance between GPS coordinates
+    R = 6371  # Earth radius in kilometers
+
+    # Convert to radians
+    lat1_rad = math.radians(lat1)
+    lon1_rad = math.radians(lon1)
+    lat2_rad = math.radians(lat2)
+    lon2_rad = math.radians(lon2)
+
+    # Differences
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    # Haversine formula
+    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    distance = R * c
+
+    # Convert to meters
+    return distance * 1000
+
+# ----------------------------------------------------------
+# Pure Python
+# ----------------------------------------------------------
+
+def distances_to_point_python(lat, lng, points):
+    """Return the distance in meters from (lat, lng) to each (lat, lng) in points"""
+    return [calculate_distance(lat, lng, point_lat, point_lng) for point_lat, point_lng in points]
+
+def close_pairs_python(points, min_distance):
+    """Return (i, j, distance) for every pair of points closer than min_distance, i < j"""
+    pairs = []
+    for i, (lat1, lng1) in enumerate(points):
+        for j in range(i + 1, len(points)):
+            distance = calculate_distance(lat1, lng1, points[j][0], points[j][1])
+            if distance < min_distance:
+                pairs.append((i, j, distance))
+    return pairs
+
+# ----------------------------------------------------------
+# NumPy
+# ----------------------------------------------------------
+
+def haversine_numpy(lat1, lng1, lat2, lng2):
+    """Element-wise haversine distance in meters between broadcastable arrays of degrees"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2) - np.radians(lng1)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+
+    # Rounding can push a a hair outside [0, 1] for identical or antipodal points
+    a = np.clip(a, 0.0, 1.0)
+    return 2 * EARTH_RADIUS_METERS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def distances_to_point_numpy(lat, lng, points):
+    coordinates = np.asarray(points, dtype=float).reshape(-1, 2)
+    return haversine_numpy(lat, lng, coordinates[:, 0], coordinates[:, 1]).tolist()
+
+def close_pairs_numpy(points, min_distance):
+    coordinates = np.asarray(points, dtype=float).reshape(-1, 2)
+    lats = coordinates[:, 0]
+    lngs = coordinates[:, 1]
+    count = len(coordinates)
+
+    pairs = []
+    for start in range(0, count, PAIRWISE_BLOCK_ROWS):
+        stop = min(start + PAIRWISE_BLOCK_ROWS, count)
+
+        # Distances from this block of rows to every later point
+        block = haversine_numpy(lats[start:stop, None], lngs[start:stop, None], lats[None, start:], lngs[None, start:])
+        rows, columns = np.nonzero(block < min_distance)
+
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            i = start + row
+            j = start + column
+            if i < j:
+                pairs.append((i, j, float(block[row, column])))
+
+    pairs.sort()
+    return pairs
+
+# ----------------------------------------------------------
+# Bulk functions, using NumPy when available
+# ----------------------------------------------------------
+
+if HAVE_NUMPY:
+    distances_to_point = distances_to_point_numpy
+    close_pairs = close_pairs_numpy
+else:
+    distances_to_point = distances_to_point_python
+    close_pairs = close_pairs_python
@@ -32,6 +32,8 @@ const appState = {
     hostsLoaded: false,  // Whether hosts have been loaded
     hostsError: null,    // Error state for host loading
     games: [],           // Array of game objects
+    gamesPage: 0,        // Last page of games loaded
+    gamesTotal: 0,       // Number of games on the server
     gamesLoading: false, // Loading state for games
     gamesLoaded: false,  // Whether games have been loaded
     gamesError: null     // Error state for game loading
@@ -694,18 +696,91 @@ async function fetchGameData(gameId) {
   }
 }
 
+// ETag of the last game update, so unchanged games are answered with 304 Not Modified
+let lastGameUpdateEtag = null;
+let lastGameUpdateId = null;
+let lastGameVersion = null;
+
+// Merge a delta from /games/<id>?since= into a full copy of the game
+function mergeGameDelta(current, delta) {
+  const byId = items => new Map((items || []).map(item => [item.id, item]));
+  const teams = byId(current.teams);
+  const bases = byId(current.bases);
+
+  // Changed teams replace their old fields; rosters are kept if the delta left them out
+  (delta.teams || []).forEach(team => {
+    teams.set(team.id, { ...teams.get(team.id), ...team });
+  });
+  (delta.bases || []).forEach(base => {
+    bases.set(base.id, base);
+  });
+
+  // Lists of ids drop removed teams and bases and keep the server's order
+  const mergedTeams = delta.teamIds.filter(id => teams.has(id)).map(id => teams.get(id));
+  mergedTeams.forEach(team => {
+    if (team.id in delta.scores) {
+      team.score = delta.scores[team.id];
+    }
+  });
+
+  return {
+    ...delta,
+    teams: mergedTeams,
+    bases: delta.baseIds.filter(id => bases.has(id)).map(id => bases.get(id))
+  };
+}
+
 // Fetch scores and game updates
 async function fetchGameUpdates() {
   if (!appState.gameData.id) return;
 
   try {
-    // Fetch complete game data instead of just scores
-    const response = await fetch(API_BASE_URL + '/games/' + appState.gameData.id);
+    // Only send the ETag if it belongs to the game we're showing
+    const headers = {};
+    const sameGame = lastGameUpdateId === appState.gameData.id;
+    if (lastGameUpdateEtag && sameGame) {
+      headers['If-None-Match'] = lastGameUpdateEtag;
+    }
+
+    // Once we hold the whole game, ask only for what changed since; players don't need rosters
+    const params = new URLSearchParams();
+    if (sameGame && lastGameVersion !== null) {
+      params.set('since', lastGameVersion);
+    }
+    if (!getAuthState().isHost) {
+      params.set('fields', 'teams,bases');
+    }
+    const query = params.toString() ? '?' + params.toString() : '';
+
+    const response = await fetch(API_BASE_URL + '/games/' + appState.gameData.id + query, {
+      headers: headers,
+      cache: 'no-store'
+    });
+
+    // Nothing changed since the last update
+    if (response.status === 304) {
+      return;
+    }
+
     if (!response.ok) {
       throw new Error('Failed to fetch game updates');
     }
 
-    const gameData = await response.json();
+    lastGameUpdateEtag = response.headers.get('ETag');
+    lastGameUpdateId = appState.gameData.id;
+    lastGameVersion = Number(response.headers.get('X-Game-Version'));
+
+    let gameData = await response.json();
+
+    // Deltas are applied to the cache as well as to the game we're showing
+    if (window.dbHelpers) {
+      window.dbHelpers.cacheGameData(gameData).catch(cacheErr => {
+        console.warn('Failed to cache game update:', cacheErr);
+      });
+    }
+    if (gameData.since !== undefined) {
+      gameData = mergeGameDelta(appState.gameData, gameData);
+    }
 
     // Update teams with scores
     appState.gameData.teams = gameData.teams;
@@ -751,26 +826,99 @@ async function fetchGameUpdates() {
   }
 }
 
-// Set up polling for scores
+// Live updates: a Server-Sent Events stream, with polling only while the stream is down
 let scorePollingInterval = null;
+let gameEventSource = null;
+
+// Events after which the game snapshot needs to be fetched again
+const GAME_CHANGE_EVENTS = ['capture', 'join', 'team', 'base', 'settings', 'started', 'ended', 'deleted'];
 
 function startScorePolling() {
   if (appState.page === 'gameView' && appState.gameData.id) {
     // Initial fetch
     fetchGameUpdates();
 
-    // Clear any existing interval
+    if (window.EventSource) {
+      subscribeToGameEvents(appState.gameData.id);
+    } else {
+      startPollingFallback();
+    }
+  }
+}
+
+function stopScorePolling() {
+  if (gameEventSource) {
+    gameEventSource.close();
+    gameEventSource = null;
+    console.log('Game event stream closed');
+  }
+  stopPollingFallback();
+}
+
+function subscribeToGameEvents(gameId) {
+  if (gameEventSource) {
+    gameEventSource.close();
+  }
+
+  gameEventSource = new EventSource(`${API_BASE_URL}/games/${gameId}/events`);
+
+  gameEventSource.onopen = () => {
+    console.log('Game event stream connected');
+    // Catch up on anything missed while disconnected, then rely on the stream
     if (scorePollingInterval) {
-      clearInterval(scorePollingInterval);
+      stopPollingFallback();
+      fetchGameUpdates();
+    }
+  };
+
+  gameEventSource.onerror = () => {
+    // The browser reconnects by itself; poll until it does
+    console.warn('Game event stream dropped, polling until it reconnects');
+    startPollingFallback();
+  };
+
+  GAME_CHANGE_EVENTS.forEach(eventType => {
+    gameEventSource.addEventListener(eventType, () => fetchGameUpdates());
+  });
+
+  gameEventSource.addEventListener('scores', event => applyScoreTick(JSON.parse(event.data)));
+}
+
+// Apply a 'scores' event from the stream without fetching the whole game
+function applyScoreTick(tick) {
+  // A change we haven't seen (e.g. handled by another server process)
+  if (lastGameVersion === null || tick.version !== lastGameVersion || tick.status !== appState.gameData.status) {
+    fetchGameUpdates();
+    return;
+  }
+
+  const scores = {};
+  tick.scores.forEach(team => {
+    scores[team.id] = team.score;
+  });
+
+  appState.gameData.teams.forEach(team => {
+    if (team.id in scores) {
+      team.score = scores[team.id];
     }
+  });
 
-    // Set up polling every 5 seconds
-    scorePollingInterval = setInterval(fetchGameUpdates, 5000);
-    console.log('Game updates polling started');
+  if (appState.page === 'gameView' && window.updateScoreboard) {
+    window.updateScoreboard();
   }
 }
 
-function stopScorePolling() {
+function startPollingFallback() {
+  if (scorePollingInterval) {
+    return;
+  }
+
+  // Set up polling every 5 seconds
+  scorePollingInterval = setInterval(fetchGameUpdates, 5000);
+  console.log('Game updates polling started');
+}
+
+function stopPollingFallback() {
   if (scorePollingInterval) {
     clearInterval(scorePollingInterval);
     scorePollingInterval = null;
@@ -1167,15 +1315,19 @@ async function captureBase(baseId) {
         })
       });
 
-      await handleApiResponse(response, 'Failed to capture base');
+      const result = await handleApiResponse(response, 'Failed to capture base');
 
       // Update scores
       await fetchGameUpdates();
 
       // Show success message with GPS info
       if (window.showNotification) {
-        const gpsInfo = usingFreshGPS ? 'fresh GPS' : 'tracked GPS';
-        window.showNotification(`Base captured successfully! (using ${gpsInfo})`, 'success');
+        if (result.already_held) {
+          window.showNotification('Your team already holds this base.', 'info');
+        } else {
+          const gpsInfo = usingFreshGPS ? 'fresh GPS' : 'tracked GPS';
+          window.showNotification(`Base captured successfully! (using ${gpsInfo})`, 'success');
+        }
       }
     } else {
       // We're offline, store for later sync
@@ -1667,6 +1819,8 @@ function clearSiteAdminData() {
   appState.siteAdmin.hostsLoaded = false;
   appState.siteAdmin.hostsError = null;
   appState.siteAdmin.games = [];
+  appState.siteAdmin.gamesPage = 0;
+  appState.siteAdmin.gamesTotal = 0;
   appState.siteAdmin.gamesLoading = false;
   appState.siteAdmin.gamesLoaded = false;
   appState.siteAdmin.gamesError = null;
@@ -1678,9 +1832,37 @@ function refreshSiteAdminHosts() {
   loadSiteAdminHosts();
 }
 
-async function loadSiteAdminGames() {
+// Number of games fetched per page in the site admin game list
+const SITE_ADMIN_GAMES_PER_PAGE = 50;
+
+// Fetch one page of games across all hosts, with their team, base and player counts
+async function fetchAdminGames(page) {
+  if (!appState.siteAdmin.isAuthenticated || !appState.siteAdmin.token) {
+    throw new Error('Admin authentication required to fetch games.');
+  }
+
+  const response = await fetch(`${API_BASE_URL}/admin/games?page=${page}&per_page=${SITE_ADMIN_GAMES_PER_PAGE}`, {
+    headers: {
+      'Authorization': `Bearer ${appState.siteAdmin.token}`
+    }
+  });
+
+  if (!response.ok) {
+    if (response.status === 401) {
+      // Reset admin auth if unauthorized
+      appState.siteAdmin.isAuthenticated = false;
+      appState.siteAdmin.token = null;
+      throw new Error('Admin session expired. Please login again.');
+    }
+    throw new Error('Unable to load games. Please try again.');
+  }
+
+  return response.json();
+}
+
+async function loadSiteAdminGames(loadMore = false) {
   // Prevent duplicate loading
-  if (appState.siteAdmin.gamesLoading || appState.siteAdmin.gamesLoaded) {
+  if (appState.siteAdmin.gamesLoading || (appState.siteAdmin.gamesLoaded && !loadMore)) {
     return;
   }
 
@@ -1693,73 +1875,19 @@ async function loadSiteAdminGames() {
       window.renderApp();
     }
 
-    // First, get all hosts to get their games
-    const hosts = await fetchHosts();
-
-    let allGames = [];
+    const page = loadMore ? appState.siteAdmin.gamesPage + 1 : 1;
+    const result = await fetchAdminGames(page);
 
-    // For each host, get their games using existing API
-    for (const host of hosts) {
-      try {
-        const response = await fetch(`${API_BASE_URL}/hosts/${host.id}/games`);
-        if (response.ok) {
-          const hostGames = await response.json();
-
-          // Add host info to each game
-          const gamesWithHost = hostGames.map(game => ({
-            ...game,
-            host_id: host.id,
-            host_name: host.name,
-            host_qr_code: host.qr_code
-          }));
-
-          allGames = allGames.concat(gamesWithHost);
-        }
-      } catch (error) {
-        console.warn(`Failed to load games for host ${host.name}:`, error);
-      }
-    }
-
-    // For each game, get detailed info to get base/team/player counts
-    for (let i = 0; i < allGames.length; i++) {
-      try {
-        const response = await fetch(`${API_BASE_URL}/games/${allGames[i].id}`);
-        if (response.ok) {
-          const gameDetails = await response.json();
-          allGames[i].bases_count = gameDetails.bases ? gameDetails.bases.length : 0;
-          allGames[i].teams_count = gameDetails.teams ? gameDetails.teams.length : 0;
-
-          // Count total players across all teams
-          let totalPlayers = 0;
-          if (gameDetails.teams) {
-            totalPlayers = gameDetails.teams.reduce((sum, team) => sum + (team.playerCount || 0), 0);
-          }
-          allGames[i].players_count = totalPlayers;
-        }
-      } catch (error) {
-        console.warn(`Failed to load details for game ${allGames[i].id}:`, error);
-        // Set defaults if we can't get details
-        allGames[i].bases_count = 0;
-        allGames[i].teams_count = 0;
-        allGames[i].players_count = 0;
-      }
+    // Games arrive sorted by status priority, start time, creation time and id. A game whose
+    // status changed between pages can come round again, so keep the copy already listed
+    if (loadMore) {
+      const listed = new Set(appState.siteAdmin.games.map(game => game.id));
+      appState.siteAdmin.games = appState.siteAdmin.games.concat(result.games.filter(game => !listed.has(game.id)));
+    } else {
+      appState.siteAdmin.games = result.games;
     }
-
-    // Sort games by status priority and start time
-    allGames.sort((a, b) => {
-      const statusPriority = { 'active': 1, 'setup': 2, 'ended': 3 };
-      const aPriority = statusPriority[a.status] || 4;
-      const bPriority = statusPriority[b.status] || 4;
-
-      if (aPriority !== bPriority) {
-        return aPriority - bPriority;
-      }
-
-      // If same status, sort by start time (most recent first)
-      return (b.start_time || 0) - (a.start_time || 0);
-    });
-
-    appState.siteAdmin.games = allGames;
+    appState.siteAdmin.gamesPage = page;
+    appState.siteAdmin.gamesTotal = result.total;
     appState.siteAdmin.gamesLoaded = true;
     appState.siteAdmin.gamesError = null;
   } catch (error) {
@@ -1776,6 +1904,10 @@ async function loadSiteAdminGames() {
   }
 }
 
+function loadMoreSiteAdminGames() {
+  loadSiteAdminGames(true);
+}
+
 function refreshSiteAdminGames() {
   // Force refresh by clearing loaded state
   appState.siteAdmin.gamesLoaded = false;
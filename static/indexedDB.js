@@ -52,6 +52,14 @@ function initDB() {
   });
 }
 
+// Function to generate a unique key for a queued capture
+function generateIdempotencyKey() {
+  if (window.crypto && window.crypto.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  return `${Date.now()}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`;
+}
+
 // Function to add a pending capture when offline
 function addPendingCapture(baseId, playerId, latitude, longitude) {
   return new Promise((resolve, reject) => {
@@ -68,7 +76,9 @@ function addPendingCapture(baseId, playerId, latitude, longitude) {
       playerId,
       latitude,
       longitude,
-      timestamp: Date.now()
+      timestamp: Date.now(),
+      // Lets the server recognise a capture it has already recorded when a sync is retried
+      idempotencyKey: generateIdempotencyKey()
     };
     
     const request = store.add(capture);
@@ -140,7 +150,7 @@ function removePendingCapture(id) {
   });
 }
 
-// Cache game data for offline use
+// Cache game data for offline use; a delta from /games/<id>?since= is merged into the cached game
 function cacheGameData(gameData) {
   return new Promise((resolve, reject) => {
     if (!db) {
@@ -160,28 +170,34 @@ function cacheGameData(gameData) {
       lastUpdated: Date.now()
     });
     
-    // Save teams
     const teamStore = transaction.objectStore('teams');
-    if (gameData.teams && gameData.teams.length > 0) {
-      gameData.teams.forEach(team => {
-        teamStore.put({
-          ...team,
-          gameId: gameData.id,
-          lastUpdated: Date.now()
-        });
-      });
-    }
-    
-    // Save bases
     const baseStore = transaction.objectStore('bases');
-    if (gameData.bases && gameData.bases.length > 0) {
-      gameData.bases.forEach(base => {
-        baseStore.put({
-          ...base,
-          gameId: gameData.id,
-          lastUpdated: Date.now()
+    
+    if (gameData.since !== undefined) {
+      applyCachedDelta(teamStore, gameData.id, gameData.teams, gameData.teamIds, gameData.scores);
+      applyCachedDelta(baseStore, gameData.id, gameData.bases, gameData.baseIds, {});
+    } else {
+      // Save teams
+      if (gameData.teams && gameData.teams.length > 0) {
+        gameData.teams.forEach(team => {
+          teamStore.put({
+            ...team,
+            gameId: gameData.id,
+            lastUpdated: Date.now()
+          });
         });
-      });
+      }
+      
+      // Save bases
+      if (gameData.bases && gameData.bases.length > 0) {
+        gameData.bases.forEach(base => {
+          baseStore.put({
+            ...base,
+            gameId: gameData.id,
+            lastUpdated: Date.now()
+          });
+        });
+      }
     }
     
     transaction.oncomplete = event => {
@@ -196,6 +212,38 @@ function cacheGameData(gameData) {
   });
 }
 
+// Merge the changed records of a delta into a store, updating scores and dropping removed records
+function applyCachedDelta(store, gameId, changed, ids, scores) {
+  const changedById = new Map((changed || []).map(record => [record.id, record]));
+  const current = new Set(ids);
+  
+  const request = store.index('gameId').getAll(gameId);
+  request.onsuccess = event => {
+    event.target.result.forEach(cached => {
+      if (!current.has(cached.id)) {
+        store.delete(cached.id);
+        return;
+      }
+      
+      const record = { ...cached, ...changedById.get(cached.id), lastUpdated: Date.now() };
+      if (cached.id in scores) {
+        record.score = scores[cached.id];
+      }
+      store.put(record);
+      changedById.delete(cached.id);
+    });
+    
+    // Records new since the cached copy
+    changedById.forEach(record => {
+      store.put({
+        ...record,
+        gameId: gameId,
+        lastUpdated: Date.now()
+      });
+    });
+  };
+}
+
 // Load cached game data when offline
 function loadCachedGameData(gameId) {
   return new Promise((resolve, reject) => {
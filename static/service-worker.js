@@ -6,6 +6,9 @@ self.addEventListener('sync', event => {
   }
 });
 
+// Most captures sent in one sync request (the server's CAPTURE_BATCH_MAX_SIZE)
+const SYNC_BATCH_SIZE = 100;
+
 // Function to sync pending captures when online
 async function syncPendingCaptures() {
   try {
@@ -15,32 +18,43 @@ async function syncPendingCaptures() {
     // Get pending captures from IndexedDB
     const pendingCaptures = await getPendingCaptures(db);
     
-    // Process each pending capture
-    const syncPromises = pendingCaptures.map(async (capture) => {
-      try {
-        const response = await fetch(`/api/bases/${capture.baseId}/capture`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json'
-          },
-          body: JSON.stringify({
+    // Send pending captures in batches; idempotency keys make retries safe
+    for (let start = 0; start < pendingCaptures.length; start += SYNC_BATCH_SIZE) {
+      const batch = pendingCaptures.slice(start, start + SYNC_BATCH_SIZE);
+
+      const response = await fetch('/api/captures/batch', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+          captures: batch.map(capture => ({
+            // Captures queued before keys were added get one derived from their queue entry
+            idempotency_key: capture.idempotencyKey || `queued-${capture.playerId}-${capture.id}-${capture.timestamp}`,
+            base_id: capture.baseId,
             player_id: capture.playerId,
             latitude: capture.latitude,
-            longitude: capture.longitude
-          })
-        });
-        
-        if (response.ok) {
-          // Remove from pending queue if successful
-          return removePendingCapture(db, capture.id);
-        }
-      } catch (error) {
-        console.error('Sync failed for capture:', capture.id, error);
-        // Leave in queue for next sync attempt
+            longitude: capture.longitude,
+            client_time: Math.floor(capture.timestamp / 1000)
+          }))
+        })
+      });
+
+      if (!response.ok) {
+        // Leave the rest of the queue for the next sync attempt
+        break;
       }
-    });
-    
-    await Promise.all(syncPromises);
+
+      const { results } = await response.json();
+
+      // Recorded, already recorded, or rejected for good: none of these will change on retry
+      await Promise.all(batch.map((capture, index) => {
+        if (results[index].status === 'rejected') {
+          console.error('Capture rejected during sync:', capture.id, results[index].error);
+        }
+        return removePendingCapture(db, capture.id);
+      }));
+    }
     
     // Close the database connection
     db.close();
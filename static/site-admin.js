@@ -266,6 +266,18 @@ function buildGameListSection() {
   } else if (appState.siteAdmin.games.length > 0) {
     // Show games table
     buildGamesTable(gameListContainer, appState.siteAdmin.games);
+
+    // Games are fetched a page at a time
+    if (appState.siteAdmin.games.length < appState.siteAdmin.gamesTotal) {
+      const loadMoreButton = UIBuilder.createButton(
+        `Load more (${appState.siteAdmin.games.length} of ${appState.siteAdmin.gamesTotal})`,
+        function() {
+          loadMoreSiteAdminGames();
+        },
+        'mt-4 w-full bg-gray-100 text-gray-800 py-2 px-4 rounded-lg hover:bg-gray-200 transition-colors'
+      );
+      gameListContainer.appendChild(loadMoreButton);
+    }
   } else {
     // Show empty state
     gameListContainer.appendChild(UIBuilder.createEmptyState({
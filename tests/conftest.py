@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# The app reads its settings and migrates its database at import, so point it at a throwaway database first
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='qr-conquest-tests-'), 'test.db')
+os.environ.setdefault('SITE_ADMIN_PASSWORD', 'test-admin-password')
+os.environ.setdefault('LIFECYCLE_SCHEDULER_ENABLED', 'false')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import flask_app
+
+ADMIN_HEADERS = {'Authorization': f"Bearer {os.environ['SITE_ADMIN_PASSWORD']}"}
+
+@pytest.fixture
+def client():
+    return flask_app.app.test_client()
+
+@pytest.fixture
+def host_id(client):
+    response = client.post('/api/hosts', json={'name': 'Test host'}, headers=ADMIN_HEADERS)
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+def _create_game(client, host_id, teams, bases, players_per_team=3):
+    """Create and start a game of the given size, with every base captured once; return its id"""
+    game_id = client.post('/api/games', json={'host_id': host_id, 'name': f'{teams} teams'}).get_json()['game_id']
+
+    team_ids = []
+    for i in range(teams):
+        response = client.post(f'/api/games/{game_id}/teams', json={
+            'host_id': host_id, 'name': f'Team {i}', 'color': 'red', 'qr_code': str(uuid.uuid4())
+        })
+        assert response.status_code == 201
+        team_ids.append(response.get_json()['team_id'])
+
+    base_ids = []
+    for i in range(bases):
+        response = client.post(f'/api/games/{game_id}/bases', json={
+            'host_id': host_id, 'name': f'Base {i}', 'latitude': 51.5 + i * 0.001, 'longitude': -0.12,
+            'qr_code': str(uuid.uuid4())
+        })
+        assert response.status_code == 201
+        base_ids.append(response.get_json()['base_id'])
+
+    assert client.post(f'/api/games/{game_id}/start', json={'host_id': host_id}).status_code == 200
+
+    players = [client.post(f'/api/teams/{team_id}/join', json={'player_name': f'Player {i}'}).get_json()['player_id']
+               for team_id in team_ids for i in range(players_per_team)]
+
+    # One capture per player, through the batch endpoint, so the scan throttle never refuses one
+    captures = [{
+        'idempotency_key': str(uuid.uuid4()),
+        'base_id': base_id,
+        'player_id': players[i % len(players)],
+        'latitude': 51.5 + i * 0.001,
+        'longitude': -0.12
+    } for i, base_id in enumerate(base_ids)]
+    assert client.post('/api/captures/batch', json={'captures': captures}).status_code == 200
+
+    return game_id
+
+@pytest.fixture
+def create_game():
+    return _create_game
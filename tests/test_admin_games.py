@@ -0,0 +1,17 @@
+from conftest import ADMIN_HEADERS
+
+def test_game_pages_neither_repeat_nor_skip_games(client, host_id):
+    # Games in setup share a NULL start time and usually their creation second
+    for i in range(5):
+        assert client.post('/api/games', json={'host_id': host_id, 'name': f'Setup {i}'}).status_code == 201
+
+    seen = []
+    page = 1
+    while True:
+        result = client.get(f'/api/admin/games?page={page}&per_page=2', headers=ADMIN_HEADERS).get_json()
+        if not result['games']:
+            break
+        seen.extend(game['id'] for game in result['games'])
+        page += 1
+
+    assert len(seen) == len(set(seen)) == result['total']
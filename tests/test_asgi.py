@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+import asgi
+from conftest import ADMIN_HEADERS
+
+def call(method, path, body, headers):
+    """Send one request through the ASGI app, its body in two chunks; return (status, JSON body)"""
+    messages = [
+        {'type': 'http.request', 'body': body[:5], 'more_body': True},
+        {'type': 'http.request', 'body': body[5:], 'more_body': False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'http_version': '2',
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()],
+    }
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+def test_body_without_content_length_reaches_the_app():
+    # HTTP/2 and chunked HTTP/1.1 requests carry no Content-Length header
+    body = json.dumps({'name': 'Chunked host'}).encode('utf-8')
+    status, host = call('POST', '/api/hosts', body, {**ADMIN_HEADERS, 'Content-Type': 'application/json'})
+
+    assert status == 201
+    assert host['name'] == 'Chunked host'
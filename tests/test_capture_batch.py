@@ -0,0 +1,108 @@
+import time
+import uuid
+
+import pytest
+
+import flask_app
+
+BASE_LAT = 51.5
+BASE_LNG = -0.12
+
+@pytest.fixture
+def game(client, host_id):
+    """A game in setup with two teams of one player and one base; returns a dict of ids"""
+    game_id = client.post('/api/games', json={'host_id': host_id, 'name': 'Batch'}).get_json()['game_id']
+
+    teams = [client.post(f'/api/games/{game_id}/teams', json={
+        'host_id': host_id, 'name': f'Team {i}', 'color': 'red', 'qr_code': str(uuid.uuid4())
+    }).get_json()['team_id'] for i in range(2)]
+
+    base_id = client.post(f'/api/games/{game_id}/bases', json={
+        'host_id': host_id, 'name': 'Base', 'latitude': BASE_LAT, 'longitude': BASE_LNG, 'qr_code': str(uuid.uuid4())
+    }).get_json()['base_id']
+
+    players = [client.post(f'/api/teams/{team_id}/join', json={'player_name': 'Player'}).get_json()['player_id']
+               for team_id in teams]
+
+    return {'id': game_id, 'host_id': host_id, 'base_id': base_id, 'players': players}
+
+def start(client, game):
+    assert client.post(f"/api/games/{game['id']}/start", json={'host_id': game['host_id']}).status_code == 200
+
+def sync(client, game, player, client_time, key=None):
+    response = client.post('/api/captures/batch', json={'captures': [{
+        'idempotency_key': key or str(uuid.uuid4()),
+        'base_id': game['base_id'],
+        'player_id': game['players'][player],
+        'latitude': BASE_LAT,
+        'longitude': BASE_LNG,
+        'client_time': client_time
+    }]})
+    assert response.status_code == 200
+    return response.get_json()['results'][0]
+
+def game_row(game_id):
+    conn = flask_app.open_db_connection()
+    try:
+        return conn.execute('SELECT * FROM games WHERE id = ?', (game_id,)).fetchone()
+    finally:
+        conn.close()
+
+def test_captures_are_refused_before_the_game_starts(client, game):
+    result = sync(client, game, 0, 1)
+    assert result['status'] == 'rejected' and result['code'] == 400
+
+def test_client_time_is_clamped_to_the_game_start(client, game):
+    start(client, game)
+    started = game_row(game['id'])['start_time']
+
+    assert sync(client, game, 0, 1)['capture_time'] >= started
+    assert sync(client, game, 1, time.time() + 3600)['capture_time'] <= time.time()
+
+def test_client_time_is_clamped_to_the_current_hold(client, game):
+    start(client, game)
+
+    held_since = sync(client, game, 0, None)['capture_time']
+    assert sync(client, game, 1, held_since - 60)['capture_time'] == held_since
+
+    scores = client.get(f"/api/games/{game['id']}/scores").get_json()
+    assert all(team['score'] >= 0 for team in scores)
+
+def test_retried_capture_is_recorded_once(client, game):
+    start(client, game)
+    key = str(uuid.uuid4())
+
+    first = sync(client, game, 0, None, key)
+    retry = sync(client, game, 0, None, key)
+    assert first['status'] == 'captured'
+    assert retry == {'status': 'duplicate', 'capture_time': first['capture_time'], 'idempotency_key': key}
+
+def test_client_time_is_clamped_to_the_offline_window(client, game, monkeypatch):
+    start(client, game)
+    monkeypatch.setitem(flask_app.app.config, 'CAPTURE_MAX_OFFLINE_SECONDS', 0)
+
+    synced = time.time()
+    assert sync(client, game, 0, 1)['capture_time'] >= int(synced)
+
+def test_synced_scans_are_throttled_like_live_scans(client, game):
+    start(client, game)
+    burst = flask_app.app.config['CAPTURE_SCAN_BURST']
+
+    now = int(time.time())
+    results = [sync(client, game, i % 2, now) for i in range(burst * 2 + 2)]
+    assert results[-1] == {'status': 'rejected', 'error': 'Scanning too fast', 'code': 429,
+                           'idempotency_key': results[-1]['idempotency_key']}
+
+def test_rescan_by_the_holding_team_records_nothing(client, game):
+    start(client, game)
+
+    sync(client, game, 0, None)
+    result = sync(client, game, 0, None)
+    assert result['status'] == 'captured' and result['already_held']
+
+    conn = flask_app.open_db_connection()
+    try:
+        captures = conn.execute('SELECT COUNT(*) FROM captures WHERE base_id = ?', (game['base_id'],)).fetchone()[0]
+    finally:
+        conn.close()
+    assert captures == 1
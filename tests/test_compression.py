@@ -0,0 +1,14 @@
+def test_revalidation_keeps_the_etag_of_the_compressed_response(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=20, bases=20)
+    headers = {'Accept-Encoding': 'gzip'}
+
+    response = client.get(f'/api/games/{game_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+
+    revalidated = client.get(f'/api/games/{game_id}', headers={**headers, 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert 'Accept-Encoding' in revalidated.headers['Vary']
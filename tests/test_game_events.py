@@ -0,0 +1,36 @@
+import time
+
+import flask_app
+
+class RecordingSubscriber:
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+
+    def send(self, message):
+        self.messages.append(message)
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_new_subscriber_alone_gets_the_current_scores(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=2, bases=1)
+    broker = flask_app.game_event_broker
+    first = RecordingSubscriber()
+    second = RecordingSubscriber()
+
+    broker.subscribe(game_id, first)
+    try:
+        assert wait_for(lambda: len(first.messages) == 1)
+        assert first.messages[0].startswith(b'event: scores\n')
+
+        broker.subscribe(game_id, second)
+        assert wait_for(lambda: len(second.messages) == 1)
+        time.sleep(0.1)
+        assert len(first.messages) == 1
+    finally:
+        broker.unsubscribe(game_id, first)
+        broker.unsubscribe(game_id, second)
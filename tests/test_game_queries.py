@@ -0,0 +1,17 @@
+import flask_app
+
+def count_statements(client, url):
+    """Return the SQL statements run by an uncached GET of url"""
+    flask_app.game_snapshot_cache.invalidate(url.split('/')[3])
+    response = client.get(url)
+    assert response.status_code == 200
+    return flask_app.request_metrics.sql_statements
+
+def test_game_queries_do_not_grow_with_teams_and_bases(client, host_id, create_game):
+    small = create_game(client, host_id, teams=2, bases=1)
+    large = create_game(client, host_id, teams=20, bases=20)
+
+    for path in ('', '/scores'):
+        small_count = count_statements(client, f'/api/games/{small}{path}')
+        assert small_count > 0
+        assert count_statements(client, f'/api/games/{large}{path}') == small_count
@@ -0,0 +1,45 @@
+import flask_app
+
+def end_game(client, host_id, game_id):
+    assert client.post(f'/api/games/{game_id}/end', json={'host_id': host_id}).status_code == 200
+
+def stored_results(game_id):
+    conn = flask_app.open_db_connection()
+    try:
+        return conn.execute('SELECT version FROM game_results WHERE game_id = ?', (game_id,)).fetchone()
+    finally:
+        conn.close()
+
+def test_ended_game_is_sent_like_a_live_game(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=2, bases=2)
+    end_game(client, host_id, game_id)
+
+    for path in ('', '/scores'):
+        response = client.get(f'/api/games/{game_id}{path}')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == f'public, max-age={flask_app.FINAL_RESULTS_MAX_AGE}'
+        assert response.get_data() == flask_app.json_body(response.get_json())
+
+    game = client.get(f'/api/games/{game_id}?fields=bases').get_json()
+    assert 'bases' in game and 'teams' not in game
+
+    game = client.get(f'/api/games/{game_id}?since=0').get_json()
+    assert game['since'] == 0 and len(game['teamIds']) == 2
+
+def test_reading_an_ended_game_does_not_write(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=2, bases=1)
+    end_game(client, host_id, game_id)
+    frozen = client.get(f'/api/games/{game_id}').get_data()
+
+    conn = flask_app.open_db_connection()
+    conn.execute('DELETE FROM game_results WHERE game_id = ?', (game_id,))
+    conn.commit()
+    conn.close()
+    flask_app.game_results_cache.invalidate(game_id)
+
+    assert client.get(f'/api/games/{game_id}').get_data() == frozen
+    assert stored_results(game_id) is None
+
+    result = flask_app.app.test_cli_runner().invoke(args=['rebuild-score-ledger', '--game', game_id])
+    assert result.exit_code == 0
+    assert stored_results(game_id) is not None
@@ -0,0 +1,31 @@
+import flask_app
+
+def test_base_index_survives_captures(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=2, bases=3)
+    game = client.get(f'/api/games/{game_id}').get_json()
+    base = game['bases'][0]
+    url = f"/api/games/{game_id}/nearest-bases?lat={base['lat']}&lng={base['lng']}"
+
+    first = client.get(url).get_json()['bases'][0]
+    assert first['id'] == base['id'] and first['ownedBy'] == base['ownedBy']
+    index = flask_app.base_index_cache.entries[game_id][1]
+
+    # A capture by the other team moves ownership but leaves the index in place
+    other_team = next(team for team in game['teams'] if team['id'] != base['ownedBy'])
+    player_id = other_team['players'][0]['id']
+    response = client.post(f"/api/bases/{base['id']}/capture", json={
+        'player_id': player_id, 'latitude': base['lat'], 'longitude': base['lng']
+    })
+    assert response.status_code == 200
+
+    assert client.get(url).get_json()['bases'][0]['ownedBy'] == other_team['id']
+    assert flask_app.base_index_cache.entries[game_id][1] is index
+
+    # Moving a base changes the layout, so the index is rebuilt
+    conn = flask_app.open_db_connection()
+    conn.execute('UPDATE bases SET latitude = latitude + 1 WHERE id = ?', (game['bases'][1]['id'],))
+    conn.commit()
+    conn.close()
+
+    client.get(url)
+    assert flask_app.base_index_cache.entries[game_id][1] is not index
@@ -0,0 +1,17 @@
+import sqlite3
+
+import flask_app
+
+def test_hot_queries_use_indexes():
+    assert flask_app.check_query_plans() == []
+
+def test_find_table_scans_reports_missing_indexes():
+    # Guards the check itself: without the hot-path indexes the same queries scan
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    flask_app.apply_migrations(conn)
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall():
+        conn.execute(f'DROP INDEX {name}')
+
+    assert flask_app.find_table_scans(conn)
+    conn.close()
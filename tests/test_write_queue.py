@@ -0,0 +1,51 @@
+import threading
+import time
+
+import flask_app
+
+def test_queued_capture_is_refused_once_the_game_has_ended(client, host_id, create_game):
+    game_id = create_game(client, host_id, teams=2, bases=1, players_per_team=1)
+    game = client.get(f'/api/games/{game_id}').get_json()
+    base = game['bases'][0]
+    player_id = game['teams'][0]['players'][0]['id']
+
+    # Hold the writer until the capture is queued behind a write that ends the game
+    started = threading.Event()
+    release = threading.Event()
+
+    def end_game(cursor):
+        started.set()
+        release.wait(5)
+        cursor.execute("UPDATE games SET status = 'ended', end_time = ? WHERE id = ?", (int(time.time()), game_id))
+        flask_app.bump_game_version(cursor, game_id)
+
+    ending = threading.Thread(target=flask_app.perform_write, args=(end_game,))
+    ending.start()
+    assert started.wait(5)
+
+    responses = []
+    capturing = threading.Thread(target=lambda: responses.append(client.post(f"/api/bases/{base['id']}/capture", json={
+        'player_id': player_id, 'latitude': base['lat'], 'longitude': base['lng']
+    })))
+    capturing.start()
+
+    deadline = time.monotonic() + 5
+    while flask_app.write_queue.queue.qsize() == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    ending.join()
+    capturing.join()
+
+    assert responses[0].status_code == 400
+    assert responses[0].get_json()['error'] == 'Game has ended and can no longer be changed'
+
+def test_queued_write_statements_count_for_the_submitting_request():
+    def write(cursor):
+        cursor.execute('SELECT 1')
+        cursor.execute('SELECT 2')
+
+    flask_app.request_metrics.sql_statements = 0
+    flask_app.perform_write(write)
+
+    # The two statements plus the write's SAVEPOINT and RELEASE
+    assert flask_app.request_metrics.sql_statements == 4